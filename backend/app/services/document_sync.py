@@ -133,10 +133,18 @@ class DocumentSyncService:
         Returns:
             Created DocumentVersion
         """
-        # Check if document has changed
-        if not self.version_manager.has_changed(doc_id, file_path):
-            logger.info("document_unchanged_skipping", doc_id=doc_id)
-            return self.version_manager.get_current_version(doc_id)
+        # Check if document has changed. New files and size changes need no
+        # hash to tell (register_version hashes them); otherwise hash once and
+        # reuse it for registration, along with the stat taken before hashing
+        if self.version_manager.has_size_changed(doc_id, file_path):
+            file_hash = file_size = file_mtime_ns = None
+        else:
+            file_digest, file_stat = self.version_manager.compute_file_digest_and_stat(file_path)
+            file_hash = file_digest.hex()
+            file_size, file_mtime_ns = file_stat.st_size, file_stat.st_mtime_ns
+            if not self.version_manager.has_changed(doc_id, file_path, file_hash=file_hash):
+                logger.info("document_unchanged_skipping", doc_id=doc_id)
+                return self.version_manager.get_current_version(doc_id)
 
         # Invalidate old chunks
         deleted_count = self.invalidate_old_chunks(doc_id)
@@ -146,7 +154,10 @@ class DocumentSyncService:
             doc_id=doc_id,
             file_path=file_path,
             version=version,
-            metadata=metadata
+            metadata=metadata,
+            file_hash=file_hash,
+            file_size=file_size,
+            file_mtime_ns=file_mtime_ns
         )
 
         logger.info(
@@ -3,14 +3,84 @@ Text Chunking Utilities for RAG
 Intelligent text splitting with context preservation
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import re
+import sys
 from dataclasses import dataclass
+from itertools import chain
 
 
-@dataclass
+# dataclass(slots=True) needs Python 3.10+; older interpreters get plain dataclasses
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+# Header terms per table type, in priority order (first matching type wins)
+_TABLE_TYPE_TERMS = (
+    ("dosing", ("dose", "dosage", "volume", "frequency", "session")),
+    ("composition", ("composition", "ingredient", "component", "concentration")),
+    ("comparison", ("product", "vs", "comparison", "versus")),
+    ("protocol", ("step", "phase", "treatment", "procedure")),
+    ("indication", ("indication", "contraindication", "condition")),
+    ("results", ("result", "outcome", "improvement", "efficacy")),
+)
+_TABLE_TYPE_PRIORITY = {table_type: rank for rank, (table_type, _) in enumerate(_TABLE_TYPE_TERMS)}
+
+# Zero-width lookahead so every term occurrence is seen, even when terms overlap
+_TABLE_TYPE_RE = re.compile(
+    "(?=" + "|".join(
+        f"(?P<{table_type}>{'|'.join(terms)})" for table_type, terms in _TABLE_TYPE_TERMS
+    ) + ")"
+)
+
+# Default markdown section header pattern for TextChunker.chunk_by_sections
+_SECTION_HEADER_RE = re.compile(r'\n#{1,3}\s+(.+)\n')
+
+
+def _compute_chunk_boundaries(
+    lengths: List[int],
+    chunk_size: int,
+    chunk_overlap: int
+) -> List[Tuple[int, int]]:
+    """
+    Group consecutive sentences into overlapping chunk windows
+
+    Works on sentence lengths only, so the hot loop is plain integer
+    arithmetic with no string building.
+
+    Args:
+        lengths: Length of each sentence, in order
+        chunk_size: Target size for each chunk (characters)
+        chunk_overlap: Maximum characters carried over into the next chunk
+
+    Returns:
+        List of (first_sentence, end_sentence) index pairs, end exclusive.
+        The last pair is the trailing (possibly undersized) chunk.
+    """
+    boundaries = []
+    window_start = 0
+    current_length = 0  # Joined length of the window, +1 per sentence for the space
+
+    for i, sentence_length in enumerate(lengths):
+        # If adding this sentence exceeds chunk_size, close the current window
+        if current_length + sentence_length > chunk_size and i > window_start:
+            boundaries.append((window_start, i))
+
+            # Keep trailing sentences that fit in the overlap for context
+            while window_start < i and current_length > chunk_overlap:
+                current_length -= lengths[window_start] + 1
+                window_start += 1
+
+        current_length += sentence_length + 1
+
+    if window_start < len(lengths):
+        boundaries.append((window_start, len(lengths)))
+
+    return boundaries
+
+
+@dataclass(**DATACLASS_SLOTS)
 class Chunk:
-    """Represents a text chunk with metadata"""
+    """Represents a text chunk with metadata (slotted; documents produce many)"""
     text: str
     chunk_id: str
     metadata: Dict[str, Any]
@@ -40,7 +110,7 @@ class TextChunker:
         self.min_chunk_size = min_chunk_size
         
         # Sentence boundary regex (matches . ! ? followed by space/newline)
-        self.sentence_endings = re.compile(r'([.!?])\s+')
+        self.sentence_endings = re.compile(r'[.!?]\s+')
     
     def chunk_text(
         self,
@@ -62,66 +132,57 @@ class TextChunker:
         
         base_metadata = base_metadata or {}
         
-        # Split into sentences first
-        sentences = self._split_into_sentences(text)
+        # Split into sentences first, keeping their offsets in the source text
+        sentences = self._split_into_sentence_spans(text)
         
-        # Build chunks from sentences
-        chunks = []
-        current_chunk = []
-        current_length = 0
-        char_position = 0
-        actual_chunk_start = 0  # Track actual position in original text
-
-        for sentence in sentences:
-            sentence_length = len(sentence)
-
-            # If adding this sentence exceeds chunk_size, finalize current chunk
-            if current_length + sentence_length > self.chunk_size and current_chunk:
-                chunk_text = ' '.join(current_chunk)
-
-                chunks.append(Chunk(
-                    text=chunk_text,
-                    chunk_id=f"chunk_{len(chunks)}",
-                    metadata={
-                        **base_metadata,
-                        "chunk_index": len(chunks),
-                        "chunk_length": len(chunk_text)
-                    },
-                    char_start=actual_chunk_start,  # Use tracked position
-                    char_end=actual_chunk_start + len(chunk_text)
-                ))
-
-                # Update position tracker
-                actual_chunk_start += len(chunk_text) + 1  # +1 for space
-
-                # Keep overlap sentences for context
-                overlap_text = chunk_text[-self.chunk_overlap:]
-                overlap_sentences = self._split_into_sentences(overlap_text)
-                current_chunk = overlap_sentences
-                current_length = sum(len(s) + 1 for s in overlap_sentences)
+        # Decide chunk windows from sentence lengths, then build each chunk once
+        boundaries = _compute_chunk_boundaries(
+            [end - start for _, start, end in sentences],
+            self.chunk_size,
+            self.chunk_overlap
+        )
+        chunks = [
+            self._build_chunk(sentences[first:last], index, base_metadata)
+            for index, (first, last) in enumerate(boundaries)
+        ]
+
+        # Drop the trailing chunk if it is too small
+        if chunks and len(chunks[-1].text) < self.min_chunk_size:
+            chunks.pop()
+        
+        return chunks
 
-            current_chunk.append(sentence)
-            current_length += sentence_length + 1  # +1 for space
-            char_position += sentence_length + 1
+    def _build_chunk(
+        self,
+        sentences: List[Tuple[str, int, int]],
+        index: int,
+        base_metadata: Dict[str, Any]
+    ) -> Chunk:
+        """
+        Join a window of sentences into a Chunk
 
-        # Add final chunk
-        if current_chunk:
-            chunk_text = ' '.join(current_chunk)
-            if len(chunk_text) >= self.min_chunk_size:
+        Args:
+            sentences: (sentence, char_start, char_end) tuples in the window
+            index: Position of the chunk in the output
+            base_metadata: Base metadata to include in the chunk
 
-                chunks.append(Chunk(
-                    text=chunk_text,
-                    chunk_id=f"chunk_{len(chunks)}",
-                    metadata={
-                        **base_metadata,
-                        "chunk_index": len(chunks),
-                        "chunk_length": len(chunk_text)
-                    },
-                    char_start=actual_chunk_start,  # Use tracked position
-                    char_end=actual_chunk_start + len(chunk_text)
-                ))
-        
-        return chunks
+        Returns:
+            Chunk spanning the sentences
+        """
+        chunk_text = ' '.join([sentence for sentence, _, _ in sentences])
+
+        # Copy the shared base, then set per-chunk keys
+        metadata = base_metadata.copy()
+        metadata["chunk_index"] = index
+        metadata["chunk_length"] = len(chunk_text)
+
+        return Chunk(
+            text=chunk_text,
+            chunk_id=f"chunk_{index}",
+            metadata=metadata,
+            char_start=sentences[0][1],
+            char_end=sentences[-1][2]
+        )
     
     def _split_into_sentences(self, text: str) -> List[str]:
         """
@@ -133,22 +194,38 @@ class TextChunker:
         Returns:
             List of sentences
         """
-        # Split on sentence boundaries
-        sentences = self.sentence_endings.split(text)
-        
-        # Recombine sentence endings with their sentences
+        return [sentence for sentence, _, _ in self._split_into_sentence_spans(text)]
+
+    def _split_into_sentence_spans(self, text: str) -> List[Tuple[str, int, int]]:
+        """
+        Split text into sentences along with their character offsets
+
+        Args:
+            text: Input text
+
+        Returns:
+            List of (sentence, char_start, char_end) tuples
+        """
         result = []
-        for i in range(0, len(sentences) - 1, 2):
-            if i + 1 < len(sentences):
-                sentence = sentences[i] + sentences[i + 1]
-                sentence = sentence.strip()
-                if sentence:
-                    result.append(sentence)
-        
+        last_end = 0
+
+        # Single pass over the boundaries: each sentence runs from the end of
+        # the previous boundary through this boundary's punctuation
+        for match in self.sentence_endings.finditer(text):
+            raw = text[last_end:match.start() + 1]
+            sentence = raw.strip()
+            if sentence:
+                start = last_end + len(raw) - len(raw.lstrip())
+                result.append((sentence, start, start + len(sentence)))
+            last_end = match.end()
+
         # Handle last sentence if no ending punctuation
-        if sentences and sentences[-1].strip():
-            result.append(sentences[-1].strip())
-        
+        raw = text[last_end:]
+        tail = raw.strip()
+        if tail:
+            start = last_end + len(raw) - len(raw.lstrip())
+            result.append((tail, start, start + len(tail)))
+
         return result
     
     def chunk_by_sections(
@@ -170,8 +247,12 @@ class TextChunker:
         """
         base_metadata = base_metadata or {}
         
-        # Find all section headers
-        sections = re.split(section_pattern, text)
+        # Find all section headers (the default pattern is compiled once)
+        if section_pattern == _SECTION_HEADER_RE.pattern:
+            section_re = _SECTION_HEADER_RE
+        else:
+            section_re = re.compile(section_pattern)
+        sections = section_re.split(text)
         
         chunks = []
         current_section = None
@@ -227,6 +308,7 @@ class TableChunker:
             return str(cell).strip().replace("\n", " ")
 
         headers = [clean_cell(h) for h in headers]
+        num_cols = len(headers)
 
         # Build markdown table
         markdown_parts = []
@@ -236,23 +318,20 @@ class TableChunker:
             markdown_parts.append(f"{table_context}\n")
 
         # Header row
-        header_row = "| " + " | ".join(headers) + " |"
-        markdown_parts.append(header_row)
+        markdown_parts.append("| " + " | ".join(headers) + " |")
 
         # Separator row
-        separator = "|" + "|".join(["-" * (len(h) + 2) for h in headers]) + "|"
-        markdown_parts.append(separator)
+        markdown_parts.append("|" + "|".join("-" * (len(h) + 2) for h in headers) + "|")
 
-        # Data rows
-        for row in rows:
-            cleaned_row = [clean_cell(cell) for cell in row]
-            # Pad row if it has fewer columns than headers
-            while len(cleaned_row) < len(headers):
-                cleaned_row.append("")
-            row_text = "| " + " | ".join(cleaned_row[:len(headers)]) + " |"
-            markdown_parts.append(row_text)
+        # Data rows (truncated or padded to the header width), joined lazily
+        data_rows = (
+            "| " + " | ".join(
+                [clean_cell(cell) for cell in row[:num_cols]] + [""] * (num_cols - len(row))
+            ) + " |"
+            for row in rows
+        )
 
-        return "\n".join(markdown_parts)
+        return "\n".join(chain(markdown_parts, data_rows))
 
     @staticmethod
     def infer_table_type(headers: List[str], context: str = "") -> str:
@@ -267,31 +346,16 @@ class TableChunker:
             Table type string (dosing, protocol, comparison, composition, etc.)
         """
         headers_lower = " ".join(h.lower() for h in headers if h)
-        context_lower = context.lower()
-
-        # Dosing/protocol table patterns
-        if any(term in headers_lower for term in ["dose", "dosage", "volume", "frequency", "session"]):
-            return "dosing"
-
-        # Composition table patterns
-        if any(term in headers_lower for term in ["composition", "ingredient", "component", "concentration"]):
-            return "composition"
-
-        # Comparison table patterns
-        if any(term in headers_lower for term in ["product", "vs", "comparison", "versus"]):
-            return "comparison"
 
-        # Protocol/treatment table patterns
-        if any(term in headers_lower for term in ["step", "phase", "treatment", "procedure"]):
-            return "protocol"
+        # Single scan over the headers; keep the highest-priority type seen
+        best_rank = len(_TABLE_TYPE_TERMS)
+        for match in _TABLE_TYPE_RE.finditer(headers_lower):
+            best_rank = min(best_rank, _TABLE_TYPE_PRIORITY[match.lastgroup])
+            if best_rank == 0:
+                break
 
-        # Indication/contraindication patterns
-        if any(term in headers_lower for term in ["indication", "contraindication", "condition"]):
-            return "indication"
-
-        # Results/outcomes table
-        if any(term in headers_lower for term in ["result", "outcome", "improvement", "efficacy"]):
-            return "results"
+        if best_rank < len(_TABLE_TYPE_TERMS):
+            return _TABLE_TYPE_TERMS[best_rank][0]
 
         return "general"
 
@@ -341,6 +405,13 @@ class TableChunker:
                 char_end=len(markdown_table)
             ))
         else:
+            # Keys shared by every row chunk, built once
+            row_base_metadata = {
+                **base_metadata,
+                "is_table": True,
+                "table_type": table_type
+            }
+
             # Create one chunk per row (legacy format)
             for row_idx, row in enumerate(table_data):
                 # Create text representation of row
@@ -349,16 +420,14 @@ class TableChunker:
                     for header, cell in zip(headers, row)
                 )
 
+                row_metadata = row_base_metadata.copy()
+                row_metadata["row_index"] = row_idx
+                row_metadata["headers"] = headers
+
                 chunks.append(Chunk(
                     text=row_text,
                     chunk_id=f"table_row_{row_idx}",
-                    metadata={
-                        **base_metadata,
-                        "is_table": True,
-                        "table_type": table_type,
-                        "row_index": row_idx,
-                        "headers": headers
-                    },
+                    metadata=row_metadata,
                     char_start=0,
                     char_end=len(row_text)
                 ))
@@ -3,19 +3,26 @@ Document Processing for RAG
 Extracts text, tables, and metadata from PDFs
 """
 
+import hashlib
+import io
 import os
 import re
+import sys
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 
 # PDF processing libraries
 try:
-    import PyPDF2
     import pdfplumber
+    import pypdfium2 as pdfium  # Installed with pdfplumber
     import fitz  # PyMuPDF
 except ImportError:
-    print("Warning: PDF libraries not installed. Run: pip install PyPDF2 pdfplumber pymupdf")
+    print("Warning: PDF libraries not installed. Run: pip install pdfplumber pymupdf")
 
 from .chunking import TextChunker, TableChunker, Chunk
 from .hierarchical_chunking import (
@@ -27,6 +34,73 @@ from .hierarchical_chunking import (
 )
 
 
+# Text cleanup patterns (compiled once, applied to every extracted page).
+# Written with a literal prefix ("  ", "\n\n\n") rather than a {n,}
+# repeat so the regex engine can skip ahead with a fast substring search.
+# Runs of two or more spaces (tabs are turned into spaces first)
+_SPACE_RUN_RE = re.compile(r"  +")
+_EXCESS_NEWLINES_RE = re.compile(r"\n\n\n+")
+# Standalone page number lines ("Page 1", "1/10")
+_PAGE_NUMBER_LINE_RE = re.compile(r"(?im)^\s*(?:Page\s+\d+|\d+/\d+)\s*$")
+
+# Product factsheet fields, matched in one scan. Zero-width lookahead so one
+# field's match (e.g. a long composition) never hides another field inside it.
+_PRODUCT_INFO_RE = re.compile(
+    r"(?=(?:Product|Name):\s*(?P<name>[A-Za-z®]+)"
+    r"|(?P<name_mark>[A-Z][a-z]+®)"  # Words with ® symbol
+    r"|(?:Composition|Contains?):\s*(?P<composition>[^.]+)"
+    r"|(?:Dosing|Dose|Protocol):\s*(?P<dosing>[^.]+))",
+    re.IGNORECASE
+)
+_PRODUCT_INFO_FIELDS = ("name", "composition", "dosing")
+
+# DocumentType by value, for resolving caller-supplied doc_type strings in one lookup
+_DOC_TYPES_BY_VALUE = {dt.value: dt for dt in DocumentType}
+
+# Per-document stats summed by DocumentBatch.get_summary
+_SUMMARY_CHUNK_STATS = ("num_chunks", "num_parent_chunks", "num_child_chunks", "num_flat_chunks")
+
+# Table extraction backends ("auto" prefers PyMuPDF when it has a table finder)
+_TABLE_BACKENDS = ("auto", "pymupdf", "pdfplumber")
+
+
+def _has_pymupdf_table_finder() -> bool:
+    """Check if PyMuPDF is installed with its table finder (PyMuPDF >= 1.23)"""
+    try:
+        return hasattr(fitz.Page, "find_tables")
+    except NameError:  # PyMuPDF not installed
+        return False
+
+
+# File extension for a stored image stream, by its PDF filter (what
+# extract_image() would return; other filters are re-encoded as PNG)
+_IMAGE_EXT_BY_FILTER = {
+    "DCTDecode": "jpeg",
+    "JPXDecode": "jpx",
+    "JBIG2Decode": "jb2",
+    "CCITTFaxDecode": "tiff"
+}
+
+# Below this many pages, starting worker processes costs more than it saves
+_PARALLEL_PAGES_MIN = 8
+
+
+@dataclass
+class _PageSpans:
+    """
+    Character span of each page in the joined document text
+
+    Stored as parallel lists rather than one dict per page, so lookups can
+    bisect the start offsets directly.
+    """
+    page_numbers: List[int] = field(default_factory=list)
+    starts: List[int] = field(default_factory=list)
+    ends: List[int] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
 class DocumentProcessor:
     """
     Processes documents (primarily PDFs) for RAG ingestion
@@ -38,7 +112,12 @@ class DocumentProcessor:
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
         use_hierarchical: bool = True,
-        enable_image_analysis: bool = False
+        enable_image_analysis: bool = False,
+        include_page_details: bool = False,
+        page_workers: int = 1,
+        table_backend: str = "auto",
+        vision_concurrency: int = 4,
+        retain_image_bytes: Optional[bool] = None
     ):
         """
         Args:
@@ -46,19 +125,71 @@ class DocumentProcessor:
             chunk_overlap: Overlap between chunks for context
             use_hierarchical: Use hybrid hierarchical chunking (recommended)
             enable_image_analysis: Enable Claude Vision API for image descriptions (adds cost)
+            include_page_details: Add "char_count" and "is_header_page" to each
+                page dict (not used by chunking; off to keep page dicts small)
+            page_workers: Worker processes for page text extraction of a single
+                large PDF (1 = sequential; batches parallelize per document instead)
+            table_backend: "pymupdf" (table finder on the already-open document,
+                PyMuPDF >= 1.23; ValueError on older versions), "pdfplumber", or
+                "auto" (PyMuPDF if it has the table finder, else pdfplumber)
+            vision_concurrency: Maximum Vision API requests in flight per document
+                (keep within the account's rate limits)
+            retain_image_bytes: Keep each image's bytes in the results (defaults
+                to enable_image_analysis; otherwise only image metadata is kept
+                and the image streams are never read)
         """
+        if table_backend not in _TABLE_BACKENDS:
+            raise ValueError(
+                f"Unknown table_backend '{table_backend}', expected one of {_TABLE_BACKENDS}"
+            )
+        if table_backend == "pymupdf" and not _has_pymupdf_table_finder():
+            # Only "auto" falls back to pdfplumber
+            raise ValueError(
+                "table_backend 'pymupdf' needs PyMuPDF >= 1.23 (fitz.Page.find_tables); "
+                "use 'auto' or 'pdfplumber'"
+            )
+
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.use_hierarchical = use_hierarchical
         self.enable_image_analysis = enable_image_analysis
+        self.include_page_details = include_page_details
+        self.page_workers = max(1, page_workers)
+        self.table_backend = table_backend
+        self.vision_concurrency = max(1, vision_concurrency)
+        self.retain_image_bytes = (
+            enable_image_analysis if retain_image_bytes is None else retain_image_bytes
+        )
         self.chunker = TextChunker(chunk_size, chunk_overlap)
+
+    def get_config(self) -> Dict[str, Any]:
+        """
+        Constructor arguments needed to rebuild this processor (e.g. in a worker process)
+
+        Returns:
+            Dictionary of keyword arguments for DocumentProcessor()
+        """
+        return {
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "use_hierarchical": self.use_hierarchical,
+            "enable_image_analysis": self.enable_image_analysis,
+            "include_page_details": self.include_page_details,
+            "page_workers": self.page_workers,
+            "table_backend": self.table_backend,
+            "vision_concurrency": self.vision_concurrency,
+            "retain_image_bytes": self.retain_image_bytes
+        }
     
     def process_pdf(
         self,
         file_path: str,
         doc_id: str = None,
         doc_type: str = None,
-        folder_name: str = None
+        folder_name: str = None,
+        include_full_text: bool = True,
+        extract_tables: bool = True,
+        pdf_bytes: bytes = None
     ) -> Dict[str, Any]:
         """
         Process a PDF file completely with hybrid hierarchical chunking
@@ -68,6 +199,12 @@ class DocumentProcessor:
             doc_id: Unique document identifier
             doc_type: Type of document (auto-detected if not provided)
             folder_name: Folder name for document type detection
+            include_full_text: Keep the concatenated document text in the result
+                (set False to avoid holding a second copy of the text; it can be
+                rebuilt from "pages")
+            extract_tables: Run table extraction (set False to skip it when only
+                text chunks are needed)
+            pdf_bytes: File contents if the caller has already read them
 
         Returns:
             Dictionary with processed document data:
@@ -76,7 +213,7 @@ class DocumentProcessor:
                 "doc_type": str,
                 "detected_type": str,
                 "metadata": dict,
-                "full_text": str,
+                "full_text": str (None if include_full_text is False),
                 "pages": list,
                 "chunks": list,
                 "hierarchical_chunks": list,
@@ -84,8 +221,12 @@ class DocumentProcessor:
                 "chunking_strategy": str
             }
         """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
+        # Read the file once; every extractor below works from this buffer
+        if pdf_bytes is None:
+            try:
+                pdf_bytes = Path(file_path).read_bytes()
+            except FileNotFoundError:
+                raise FileNotFoundError(f"File not found: {file_path}")
 
         # Generate doc_id if not provided
         if not doc_id:
@@ -97,59 +238,66 @@ class DocumentProcessor:
 
         print(f"Processing PDF: {file_path}")
 
-        # Extract metadata
-        metadata = self._extract_pdf_metadata(file_path)
+        # Open the PDF once; metadata, page text and images share the handle
+        doc = self._open_pdf(file_path, pdf_bytes)
+        try:
+            metadata, pages = self._extract_metadata_and_text(file_path, doc, pdf_bytes)
+            images = self._extract_images(doc) if doc is not None else []
+
+            # Extract tables (optional) from pages that can hold one
+            tables = self._extract_document_tables(file_path, doc, pdf_bytes) if extract_tables else []
+        finally:
+            if doc is not None:
+                doc.close()
+
         metadata["doc_id"] = doc_id
         metadata["source_file"] = os.path.basename(file_path)
         metadata["processed_at"] = datetime.utcnow().isoformat()
-        metadata["folder_name"] = folder_name
-
-        # Extract text by page
-        pages = self._extract_text_by_page(file_path)
+        metadata["folder_name"] = sys.intern(folder_name)
 
         # Combine all pages while preserving page-level character spans
         full_text, page_spans = self._build_full_text_with_page_spans(pages)
 
-        # Extract tables (optional, using pdfplumber)
-        tables = self._extract_tables(file_path)
-
         # Create table chunks from extracted tables
         table_chunks = self._create_table_chunks(tables, metadata)
 
-        # Extract images (optional, using PyMuPDF)
-        images = self._extract_images(file_path)
-
         # Create image chunks with descriptions (if enabled)
-        page_texts = {page["page_number"]: page["text"] for page in pages}
-        image_chunks = self._create_image_chunks(images, metadata, page_texts)
+        image_chunks = self._create_image_chunks(images, metadata, pages)
 
         # Detect document type if not provided
+        content_type = None  # Detected from this document's text/path/folder
         if not doc_type or doc_type == "document":
-            detected_type = ChunkingStrategyFactory.detect_document_type(
+            detected_type = content_type = ChunkingStrategyFactory.detect_document_type(
                 text=full_text,
                 file_path=file_path,
                 folder_name=folder_name
             )
             doc_type = detected_type.value
         else:
-            detected_type = DocumentType(doc_type) if doc_type in [dt.value for dt in DocumentType] else DocumentType.UNKNOWN
+            detected_type = _DOC_TYPES_BY_VALUE.get(doc_type, DocumentType.UNKNOWN)
 
+        # Type names repeat across every document (and every chunk's metadata
+        # copy) in a batch, so keep a single shared string for each
+        doc_type = sys.intern(doc_type)
         metadata["doc_type"] = doc_type
-        metadata["detected_type"] = detected_type.value
+        metadata["detected_type"] = sys.intern(detected_type.value)
 
         # Create chunks using appropriate strategy
         if self.use_hierarchical:
             # Use hybrid hierarchical chunking
-            hierarchical_chunks, _ = ChunkingStrategyFactory.chunk_document(
+            hierarchical_chunks, chunking_type = ChunkingStrategyFactory.chunk_document(
                 text=full_text,
                 doc_id=doc_id,
                 file_path=file_path,
                 folder_name=folder_name,
-                metadata=metadata
+                metadata=metadata,
+                doc_type=content_type
             )
 
-            # Convert to storage format
+            # Convert to storage format. The dicts share text/metadata with the
+            # chunk objects, so drop the objects as soon as they are converted.
             chunks = [chunk.to_dict() for chunk in hierarchical_chunks]
+            del hierarchical_chunks
 
             # Attach page provenance for reliable citations downstream.
             self._attach_page_provenance_to_chunks(chunks, full_text, page_spans)
@@ -164,14 +312,15 @@ class DocumentProcessor:
                 chunks.extend(image_chunks)
                 print(f"  Added {len(image_chunks)} image chunks")
 
-            # Track parent-child relationships
-            parent_chunks = [c for c in chunks if c.get("chunk_type") == "section"]
-            child_chunks = [c for c in chunks if c.get("chunk_type") == "detail"]
-            flat_chunks = [c for c in chunks if c.get("chunk_type") == "flat"]
-            table_chunk_list = [c for c in chunks if c.get("chunk_type") == "table"]
-            image_chunk_list = [c for c in chunks if c.get("chunk_type") == "image"]
+            # Track parent-child relationships (one pass over the chunks)
+            type_counts = Counter(c.get("chunk_type") for c in chunks)
+            num_parent_chunks = type_counts["section"]
+            num_child_chunks = type_counts["detail"]
+            num_flat_chunks = type_counts["flat"]
 
-            chunking_strategy = ChunkingStrategyFactory.get_chunker(detected_type).__class__.__name__
+            chunking_strategy = sys.intern(
+                ChunkingStrategyFactory.get_chunker(chunking_type).__class__.__name__
+            )
         else:
             # Legacy chunking
             chunks = self._create_chunks(pages, metadata)
@@ -184,12 +333,10 @@ class DocumentProcessor:
             if image_chunks:
                 chunks.extend(image_chunks)
 
-            hierarchical_chunks = []
-            parent_chunks = []
-            child_chunks = []
-            flat_chunks = [c for c in chunks if c.get("chunk_type") not in ["table", "image"]]
-            table_chunk_list = [c for c in chunks if c.get("chunk_type") == "table"]
-            image_chunk_list = [c for c in chunks if c.get("chunk_type") == "image"]
+            type_counts = Counter(c.get("chunk_type") for c in chunks)
+            num_parent_chunks = 0
+            num_child_chunks = 0
+            num_flat_chunks = len(chunks) - type_counts["table"] - type_counts["image"]
             chunking_strategy = "TextChunker (legacy)"
 
         return {
@@ -197,7 +344,7 @@ class DocumentProcessor:
             "doc_type": doc_type,
             "detected_type": detected_type.value,
             "metadata": metadata,
-            "full_text": full_text,
+            "full_text": full_text if include_full_text else None,
             "pages": pages,
             "chunks": chunks,
             "tables": tables,
@@ -206,148 +353,371 @@ class DocumentProcessor:
             "stats": {
                 "num_pages": len(pages),
                 "num_chunks": len(chunks),
-                "num_parent_chunks": len(parent_chunks),
-                "num_child_chunks": len(child_chunks),
-                "num_flat_chunks": len(flat_chunks),
-                "num_table_chunks": len(table_chunk_list),
+                "num_parent_chunks": num_parent_chunks,
+                "num_child_chunks": num_child_chunks,
+                "num_flat_chunks": num_flat_chunks,
+                "num_table_chunks": type_counts["table"],
                 "num_tables": len(tables),
-                "num_image_chunks": len(image_chunk_list),
+                "num_image_chunks": type_counts["image"],
                 "num_images": len(images),
                 "total_chars": len(full_text)
             }
         }
     
-    def _extract_pdf_metadata(self, file_path: str) -> Dict[str, Any]:
+    def _open_pdf(
+        self,
+        file_path: str,
+        pdf_bytes: bytes = None
+    ) -> Optional["fitz.Document"]:
         """
-        Extract metadata from PDF
-        
+        Open a PDF with PyMuPDF for all extraction steps to share
+
         Args:
             file_path: Path to PDF
-            
+            pdf_bytes: File contents, opened from memory instead of the path
+
         Returns:
-            Dictionary of metadata
+            Open PyMuPDF document (caller closes it, keeping pdf_bytes alive
+            until then), or None if it cannot be opened
         """
-        metadata = {}
-        
         try:
-            with open(file_path, 'rb') as f:
-                pdf = PyPDF2.PdfReader(f)
-                
-                # Basic metadata
-                if pdf.metadata:
-                    metadata["title"] = pdf.metadata.get("/Title", "")
-                    metadata["author"] = pdf.metadata.get("/Author", "")
-                    metadata["subject"] = pdf.metadata.get("/Subject", "")
-                    metadata["creator"] = pdf.metadata.get("/Creator", "")
-                    metadata["producer"] = pdf.metadata.get("/Producer", "")
-                
-                metadata["num_pages"] = len(pdf.pages)
+            if pdf_bytes is not None:
+                return fitz.open(stream=pdf_bytes, filetype="pdf")
+            return fitz.open(file_path)
         except Exception as e:
-            print(f"Warning: Could not extract metadata: {e}")
-            metadata["num_pages"] = 0
+            print(f"Error opening {file_path} with PyMuPDF: {e}")
+            return None
+
+    def _extract_metadata_and_text(
+        self,
+        file_path: str,
+        doc: Optional["fitz.Document"],
+        pdf_bytes: bytes = None
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Extract metadata and per-page text from an open PDF
+
+        Args:
+            file_path: Path to PDF (used by the pypdfium2 fallback)
+            doc: Open PyMuPDF document, or None if it could not be opened
+            pdf_bytes: File contents for the fallback, instead of re-reading the path
+
+        Returns:
+            Tuple of (metadata, pages)
+        """
+        if doc is None:
+            return self._extract_with_pdfium(file_path, pdf_bytes)
+
+        try:
+            metadata = self._extract_pdf_metadata(doc)
+            pages = self._extract_text_by_page(doc, pdf_bytes)
+            return metadata, pages
+
+        except Exception as e:
+            print(f"Error extracting text from {file_path}: {e}")
+            # Fallback to pypdfium2
+            return self._extract_with_pdfium(file_path, pdf_bytes)
+
+    def _extract_pdf_metadata(self, doc: "fitz.Document") -> Dict[str, Any]:
+        """
+        Extract metadata from an open PDF
         
-        return metadata
+        Args:
+            doc: Open PyMuPDF document
+            
+        Returns:
+            Dictionary of metadata
+        """
+        pdf_metadata = doc.metadata or {}
+
+        return {
+            "title": pdf_metadata.get("title") or "",
+            "author": pdf_metadata.get("author") or "",
+            "subject": pdf_metadata.get("subject") or "",
+            # Creator/producer tools repeat across a batch; share one string each
+            "creator": sys.intern(pdf_metadata.get("creator") or ""),
+            "producer": sys.intern(pdf_metadata.get("producer") or ""),
+            "num_pages": len(doc)
+        }
     
-    def _extract_text_by_page(self, file_path: str) -> List[Dict[str, Any]]:
+    def _extract_text_by_page(
+        self,
+        doc: "fitz.Document",
+        pdf_bytes: bytes = None
+    ) -> List[Dict[str, Any]]:
         """
-        Extract text from each page of PDF
+        Extract text from each page of an open PDF
         
         Args:
-            file_path: Path to PDF
+            doc: Open PyMuPDF document
+            pdf_bytes: File contents, needed to hand page ranges to worker
+                processes when page_workers > 1
             
         Returns:
-            List of page dictionaries with text and metadata
+            List of page dictionaries with page_number and text (plus
+            char_count/is_header_page if include_page_details is set)
         """
         pages = []
-        
-        try:
-            # Use PyMuPDF (fitz) for better text extraction
-            doc = fitz.open(file_path)
-            
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                text = page.get_text()
-                
-                # Clean text
-                text = self._clean_text(text)
-                
+        include_details = self.include_page_details
+
+        # PyMuPDF is not thread-safe and get_text() holds the GIL, so threads
+        # give no speedup. Large PDFs can instead be split into contiguous page
+        # ranges, each read by a worker process with its own copy of the document.
+        num_pages = len(doc)
+        if self.page_workers > 1 and pdf_bytes is not None and num_pages >= _PARALLEL_PAGES_MIN:
+            raw_texts = self._read_page_texts_parallel(pdf_bytes, num_pages)
+        else:
+            raw_texts = (_get_page_text(page) for page in doc)
+
+        for page_num, text in enumerate(raw_texts):
+            # Clean text
+            text = self._clean_text(text)
+
+            page_info = {
+                "page_number": page_num + 1,  # 1-indexed for humans
+                "text": text
+            }
+            if include_details:
+                page_info["char_count"] = len(text)
                 # Detect if this is likely a title/header page
-                is_header_page = page_num == 0 or len(text) < 200
-                
-                pages.append({
-                    "page_number": page_num + 1,  # 1-indexed for humans
-                    "text": text,
-                    "char_count": len(text),
-                    "is_header_page": is_header_page
-                })
-            
-            doc.close()
-            
-        except Exception as e:
-            print(f"Error extracting text from {file_path}: {e}")
-            # Fallback to PyPDF2
-            try:
-                with open(file_path, 'rb') as f:
-                    pdf = PyPDF2.PdfReader(f)
-                    for page_num in range(len(pdf.pages)):
-                        page = pdf.pages[page_num]
-                        text = page.extract_text()
-                        text = self._clean_text(text)
-                        
-                        pages.append({
-                            "page_number": page_num + 1,
-                            "text": text,
-                            "char_count": len(text),
-                            "is_header_page": False
-                        })
-            except Exception as e2:
-                print(f"Fallback also failed: {e2}")
-        
+                page_info["is_header_page"] = page_num == 0 or len(text) < 200
+            pages.append(page_info)
+
         return pages
+
+    def _read_page_texts_parallel(self, pdf_bytes: bytes, num_pages: int) -> List[str]:
+        """
+        Read raw page text across worker processes
+
+        Args:
+            pdf_bytes: File contents (each worker opens its own document)
+            num_pages: Number of pages in the document
+
+        Returns:
+            Raw text of every page, in page order
+        """
+        workers = min(self.page_workers, num_pages)
+        step = -(-num_pages // workers)  # Ceiling division
+        ranges = [(start, min(start + step, num_pages)) for start in range(0, num_pages, step)]
+
+        texts = []
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            # map() yields in submission order, so ranges come back in page order
+            for range_texts in executor.map(
+                _extract_pages_worker,
+                [pdf_bytes] * len(ranges),
+                [start for start, _ in ranges],
+                [end for _, end in ranges]
+            ):
+                texts.extend(range_texts)
+
+        return texts
+
+    def _extract_with_pdfium(
+        self,
+        file_path: str,
+        pdf_bytes: bytes = None
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Fallback metadata and text extraction using pypdfium2
+
+        Args:
+            file_path: Path to PDF
+            pdf_bytes: File contents, read instead of the path when given
+
+        Returns:
+            Tuple of (metadata, pages)
+        """
+        metadata = {"num_pages": 0}
+        pages = []
+
+        try:
+            pdf = pdfium.PdfDocument(pdf_bytes if pdf_bytes is not None else file_path)
+            try:
+                pdf_metadata = pdf.get_metadata_dict()
+                metadata["title"] = pdf_metadata.get("Title", "")
+                metadata["author"] = pdf_metadata.get("Author", "")
+                metadata["subject"] = pdf_metadata.get("Subject", "")
+                metadata["creator"] = sys.intern(pdf_metadata.get("Creator", ""))
+                metadata["producer"] = sys.intern(pdf_metadata.get("Producer", ""))
+                metadata["num_pages"] = len(pdf)
+
+                for page_num, page in enumerate(pdf):
+                    textpage = page.get_textpage()
+                    text = self._clean_text(textpage.get_text_range())
+                    textpage.close()
+                    page.close()
+
+                    page_info = {"page_number": page_num + 1, "text": text}
+                    if self.include_page_details:
+                        page_info["char_count"] = len(text)
+                        page_info["is_header_page"] = False
+                    pages.append(page_info)
+            finally:
+                pdf.close()
+        except Exception as e:
+            print(f"Fallback also failed: {e}")
+
+        return metadata, pages
     
-    def _extract_tables(self, file_path: str) -> List[Dict[str, Any]]:
+    def _extract_document_tables(
+        self,
+        file_path: str,
+        doc: Optional["fitz.Document"],
+        pdf_bytes: bytes = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract tables with the configured backend. PyMuPDF's table finder
+        works on the open document; pdfplumber parses the file again and is
+        used when PyMuPDF has no table finder (< 1.23) or cannot open the file.
+
+        Args:
+            file_path: Path to PDF
+            doc: Open PyMuPDF document, or None if it could not be opened
+            pdf_bytes: File contents for pdfplumber, instead of re-reading the path
+
+        Returns:
+            List of table dictionaries
+        """
+        if doc is None:
+            return self._extract_tables(file_path, pdf_bytes=pdf_bytes)
+
+        page_indices = self._find_table_candidate_pages(doc)
+        if self.table_backend != "pdfplumber" and _has_pymupdf_table_finder():
+            return self._extract_tables_pymupdf(doc, page_indices)
+        return self._extract_tables(file_path, page_indices, pdf_bytes)
+
+    def _find_table_candidate_pages(self, doc: "fitz.Document") -> List[int]:
+        """
+        Find pages that have vector graphics (lines, rectangles, curves)
+
+        The default table finders (pdfplumber and PyMuPDF) build tables from
+        ruling lines and rectangle edges, so a page without any drawings
+        cannot yield a table.
+
+        Args:
+            doc: Open PyMuPDF document
+
+        Returns:
+            0-based indices of pages worth searching for tables
+        """
+        try:
+            return [page_num for page_num, page in enumerate(doc) if page.get_cdrawings()]
+        except Exception as e:
+            print(f"Warning: Could not scan pages for drawings: {e}")
+            return list(range(len(doc)))
+
+    def _extract_tables(
+        self,
+        file_path: str,
+        page_indices: Optional[List[int]] = None,
+        pdf_bytes: bytes = None
+    ) -> List[Dict[str, Any]]:
         """
         Extract tables from PDF using pdfplumber
 
         Args:
             file_path: Path to PDF
+            page_indices: 0-based pages to search (all pages if None)
+            pdf_bytes: File contents, read instead of the path when given
 
         Returns:
             List of table dictionaries
         """
         tables = []
 
+        # No candidate pages: skip opening the PDF with pdfplumber at all
+        if page_indices is not None and not page_indices:
+            return tables
+
         try:
-            with pdfplumber.open(file_path) as pdf:
-                for page_num, page in enumerate(pdf.pages):
-                    page_tables = page.extract_tables()
+            source = io.BytesIO(pdf_bytes) if pdf_bytes is not None else file_path
+            with pdfplumber.open(source) as pdf:
+                if page_indices is None:
+                    page_indices = range(len(pdf.pages))
+
+                for page_num in page_indices:
+                    page_tables = pdf.pages[page_num].extract_tables()
 
                     for table_idx, table in enumerate(page_tables):
                         # Accept tables with at least 1 row (may be single-row tables)
                         if table and len(table) >= 1:
                             # Check if this looks like a real table (not just text blocks)
                             if len(table[0]) > 1:  # Must have at least 2 columns
-                                # If only one row, treat it as data (no separate header)
-                                if len(table) == 1:
-                                    headers = [f"Column {i+1}" for i in range(len(table[0]))]
-                                    rows = table
-                                else:
-                                    headers = table[0]
-                                    rows = table[1:]
-
-                                tables.append({
-                                    "page_number": page_num + 1,
-                                    "table_index": table_idx,
-                                    "headers": headers,
-                                    "rows": rows,
-                                    "num_rows": len(rows),
-                                    "num_cols": len(table[0]) if table else 0
-                                })
+                                tables.append(self._build_table_info(page_num, table_idx, table))
+        except Exception as e:
+            print(f"Warning: Could not extract tables: {e}")
+
+        return tables
+
+    def _extract_tables_pymupdf(
+        self,
+        doc: "fitz.Document",
+        page_indices: List[int]
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract tables from an open PDF using PyMuPDF's table finder
+
+        Args:
+            doc: Open PyMuPDF document
+            page_indices: 0-based pages to search
+
+        Returns:
+            List of table dictionaries (same shape as _extract_tables)
+        """
+        tables = []
+
+        try:
+            for page_num in page_indices:
+                for table_idx, found in enumerate(doc[page_num].find_tables().tables):
+                    # Row/column counts come from the table geometry, so
+                    # single-column layouts are skipped before reading any cell text
+                    if found.row_count < 1 or found.col_count < 2:
+                        continue
+
+                    table = found.extract()
+                    if table and len(table[0]) > 1:
+                        tables.append(self._build_table_info(page_num, table_idx, table))
         except Exception as e:
             print(f"Warning: Could not extract tables: {e}")
 
         return tables
 
+    def _build_table_info(
+        self,
+        page_num: int,
+        table_idx: int,
+        table: List[List[Optional[str]]]
+    ) -> Dict[str, Any]:
+        """
+        Build a table dictionary from extracted rows
+
+        Args:
+            page_num: 0-based page index
+            table_idx: Position of the table on its page
+            table: Extracted rows, first row used as headers (consumed:
+                the header row is popped and the list is reused as rows)
+
+        Returns:
+            Table dictionary with headers, rows and counts
+        """
+        num_cols = len(table[0])
+
+        # If only one row, treat it as data (no separate header)
+        if len(table) == 1:
+            headers = [f"Column {i+1}" for i in range(num_cols)]
+        else:
+            headers = table.pop(0)
+
+        return {
+            "page_number": page_num + 1,
+            "table_index": table_idx,
+            "headers": headers,
+            "rows": table,
+            "num_rows": len(table),
+            "num_cols": num_cols
+        }
+
     def _create_table_chunks(
         self,
         tables: List[Dict[str, Any]],
@@ -406,39 +776,49 @@ class DocumentProcessor:
 
         return table_chunks
 
-    def _extract_images(self, file_path: str) -> List[Dict[str, Any]]:
+    def _extract_images(self, doc: "fitz.Document") -> List[Dict[str, Any]]:
         """
-        Extract images from PDF using PyMuPDF (fitz)
+        Extract images from an open PDF using PyMuPDF (fitz)
 
         Args:
-            file_path: Path to PDF
+            doc: Open PyMuPDF document
 
         Returns:
             List of image dictionaries with image data and metadata
+            ("image_bytes" is None unless retain_image_bytes is set, and
+            "size_bytes" is then the stored stream size)
         """
         images = []
+        retain_bytes = self.retain_image_bytes
 
         try:
-            doc = fitz.open(file_path)
-
-            for page_num in range(len(doc)):
-                page = doc[page_num]
+            for page_num, page in enumerate(doc):
                 image_list = page.get_images(full=True)
 
                 for img_idx, img_info in enumerate(image_list):
-                    xref = img_info[0]  # Image XREF
+                    # (xref, smask, width, height, bpc, colorspace, alt. colorspace,
+                    # name, filter, ...) as stored in the PDF
+                    xref, _smask, width, height = img_info[:4]
 
-                    # Extract image bytes
-                    try:
-                        base_image = doc.extract_image(xref)
-                        image_bytes = base_image["image"]
-                        image_ext = base_image["ext"]
-                        width = base_image.get("width", 0)
-                        height = base_image.get("height", 0)
+                    # Filter out very small images (likely icons/logos) before
+                    # extract_image() reads and copies the image stream
+                    if width < 100 or height < 100:
+                        continue
 
-                        # Filter out very small images (likely icons/logos)
-                        if width < 100 or height < 100:
-                            continue
+                    try:
+                        if retain_bytes:
+                            # Extract image bytes
+                            base_image = doc.extract_image(xref)
+                            image_bytes = base_image["image"]
+                            image_ext = base_image["ext"]
+                            width = base_image.get("width", width)
+                            height = base_image.get("height", height)
+                            size_bytes = len(image_bytes)
+                        else:
+                            # Metadata only: nothing is decoded or copied
+                            image_bytes = None
+                            image_ext = _IMAGE_EXT_BY_FILTER.get(img_info[8], "png")
+                            size_bytes = self._stored_image_size(doc, xref)
 
                         # Get image position on page
                         img_rect = page.get_image_rects(xref)
@@ -453,14 +833,13 @@ class DocumentProcessor:
                             "width": width,
                             "height": height,
                             "position": position,
-                            "size_bytes": len(image_bytes)
+                            "size_bytes": size_bytes
                         })
 
                     except Exception as e:
                         print(f"Warning: Could not extract image {xref} from page {page_num + 1}: {e}")
                         continue
 
-            doc.close()
             print(f"  Extracted {len(images)} images from PDF")
 
         except Exception as e:
@@ -468,11 +847,28 @@ class DocumentProcessor:
 
         return images
 
+    def _stored_image_size(self, doc: "fitz.Document", xref: int) -> int:
+        """
+        Size of an image's stream as stored in the PDF, without decoding it
+
+        Args:
+            doc: Open PyMuPDF document
+            xref: Image XREF
+
+        Returns:
+            Stream length in bytes
+        """
+        value_type, value = doc.xref_get_key(xref, "Length")
+        if value_type == "int":
+            return int(value)
+        # Indirect or missing /Length: read the raw (still encoded) stream
+        return len(doc.xref_stream_raw(xref) or b"")
+
     def _create_image_chunks(
         self,
         images: List[Dict[str, Any]],
         base_metadata: Dict[str, Any],
-        page_texts: Dict[int, str] = None
+        pages: List[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """
         Create image chunks with Claude Vision descriptions
@@ -480,7 +876,7 @@ class DocumentProcessor:
         Args:
             images: List of image dictionaries from _extract_images
             base_metadata: Base metadata for chunks
-            page_texts: Dict mapping page numbers to page text for context
+            pages: Page dictionaries, used for each image's page context
 
         Returns:
             List of chunk dictionaries with image descriptions
@@ -490,34 +886,48 @@ class DocumentProcessor:
 
         image_chunks = []
 
+        # Page context (first 500 chars), only for pages that have images
+        image_pages = {image_info.get("page_number") for image_info in images}
+        page_contexts = {
+            page["page_number"]: page["text"][:500]
+            for page in pages or ()
+            if page["page_number"] in image_pages
+        }
+
         try:
             # Import vision service
             from app.services.vision_service import get_vision_service
             vision_service = get_vision_service()
 
+            images = [image_info for image_info in images if image_info.get("image_bytes")]
             print(f"  Analyzing {len(images)} images with Claude Vision API...")
 
-            for image_info in images:
-                page_number = image_info.get("page_number")
-                image_bytes = image_info.get("image_bytes")
-                image_ext = image_info.get("image_ext", "png")
-
-                if not image_bytes:
-                    continue
-
-                # Get page context if available
-                page_context = ""
-                if page_texts and page_number in page_texts:
-                    page_context = page_texts[page_number][:500]  # First 500 chars
-
+            def describe(image_info: Dict[str, Any]) -> Dict[str, Any]:
                 # Generate description using Claude Vision
-                result = vision_service.describe_image(
-                    image_bytes=image_bytes,
-                    image_type=image_ext,
-                    context=page_context,
+                return vision_service.describe_image(
+                    image_bytes=image_info["image_bytes"],
+                    image_type=image_info.get("image_ext", "png"),
+                    context=page_contexts.get(image_info.get("page_number"), ""),
                     max_tokens=500
                 )
 
+            # Logos and headers repeated on every page are described once
+            # (with the first occurrence's page context) and reused
+            image_keys = [
+                hashlib.blake2b(image_info["image_bytes"], digest_size=16).digest()
+                for image_info in images
+            ]
+            unique_images = {}
+            for key, image_info in zip(image_keys, images):
+                unique_images.setdefault(key, image_info)
+
+            # Each request is a network round trip, so keep several in flight
+            with ThreadPoolExecutor(max_workers=min(self.vision_concurrency, len(unique_images) or 1)) as executor:
+                described = dict(zip(unique_images, executor.map(describe, unique_images.values())))
+
+            for image_info, key in zip(images, image_keys):
+                result = described[key]
+                page_number = image_info.get("page_number")
                 description = result.get("description")
                 if not description:
                     print(f"    ⚠ Failed to describe image on page {page_number}: {result.get('error', 'unknown error')}")
@@ -571,74 +981,66 @@ class DocumentProcessor:
         Returns:
             List of chunk dictionaries
         """
+        # Chunk the document once so sentences can run across page breaks;
+        # near-empty pages (headers, blank scans) are left out. Page text is
+        # already stripped by _clean_text, so its length is the content length.
+        content_pages = [page for page in pages if len(page["text"]) >= 50]
+        text, page_spans = self._build_full_text_with_page_spans(content_pages)
+        if not text:
+            return []
+
         all_chunks = []
-        
-        for page in pages:
-            page_text = page["text"]
-            if not page_text or len(page_text.strip()) < 50:
-                continue
-            
-            # Create metadata for this page's chunks
-            chunk_metadata = {
-                **base_metadata,
-                "page_number": page["page_number"]
-            }
-            
-            # Chunk the page text
-            page_chunks = self.chunker.chunk_text(page_text, chunk_metadata)
-            
-            # Convert to dictionaries
-            for chunk in page_chunks:
-                all_chunks.append({
-                    "text": chunk.text,
-                    "chunk_id": f"{base_metadata['doc_id']}_page{page['page_number']}_chunk{chunk.chunk_id}",
-                    "metadata": chunk.metadata
-                })
+
+        for chunk in self.chunker.chunk_text(text, base_metadata):
+            # Attribute each chunk to the page it starts on
+            page_number = page_spans.page_numbers[bisect_right(page_spans.starts, chunk.char_start) - 1]
+            chunk.metadata["page_number"] = page_number
+            all_chunks.append({
+                "text": chunk.text,
+                "chunk_id": f"{base_metadata['doc_id']}_page{page_number}_chunk{chunk.chunk_id}",
+                "metadata": chunk.metadata
+            })
         
         return all_chunks
 
     def _build_full_text_with_page_spans(
         self,
         pages: List[Dict[str, Any]]
-    ) -> Tuple[str, List[Dict[str, int]]]:
+    ) -> Tuple[str, _PageSpans]:
         """
         Build full text and track per-page character spans for provenance.
 
         Returns:
             Tuple of (full_text, page_spans)
-            where page_spans entries are {"page_number": int, "start": int, "end": int}
         """
-        full_text_parts: List[str] = []
-        page_spans: List[Dict[str, int]] = []
-        cursor = 0
         separator = "\n\n"
+        sep_len = len(separator)
 
-        for page in pages:
-            page_text = (page.get("text") or "").strip()
-            if not page_text:
-                continue
-
-            if full_text_parts:
-                cursor += len(separator)
+        # Cleaned page text is already stripped, so strip() returns it as is
+        page_texts = [
+            (int(page.get("page_number", 0) or 0), page_text)
+            for page in pages
+            if (page_text := (page.get("text") or "").strip())
+        ]
 
-            start = cursor
-            end = start + len(page_text)
-            page_spans.append({
-                "page_number": int(page.get("page_number", 0) or 0),
-                "start": start,
-                "end": end
-            })
+        page_spans = _PageSpans(page_numbers=[page_number for page_number, _ in page_texts])
+        starts, ends = page_spans.starts, page_spans.ends
 
-            full_text_parts.append(page_text)
-            cursor = end
+        # Each page starts one separator past the previous page's end
+        cursor = -sep_len
+        for _, page_text in page_texts:
+            cursor += sep_len
+            starts.append(cursor)
+            cursor += len(page_text)
+            ends.append(cursor)
 
-        return separator.join(full_text_parts), page_spans
+        return separator.join([page_text for _, page_text in page_texts]), page_spans
 
     def _attach_page_provenance_to_chunks(
         self,
         chunks: List[Dict[str, Any]],
         full_text: str,
-        page_spans: List[Dict[str, int]]
+        page_spans: _PageSpans
     ) -> None:
         """
         Add page_number/page_start/page_end metadata to chunks.
@@ -647,14 +1049,17 @@ class DocumentProcessor:
             return
 
         search_cursor = 0
+        text_len = len(full_text)
+        page_numbers, starts, ends = page_spans.page_numbers, page_spans.starts, page_spans.ends
 
         for chunk in chunks:
             metadata = chunk.setdefault("metadata", {})
             start = chunk.get("char_start")
             end = chunk.get("char_end")
 
-            # Some chunkers don't provide reliable offsets; derive best-effort offsets.
-            if not isinstance(start, int) or not isinstance(end, int) or end <= start:
+            # Offsets that fall inside full_text are used as given. Some chunkers
+            # don't provide reliable offsets; derive best-effort offsets for those.
+            if not (isinstance(start, int) and isinstance(end, int) and 0 <= start < end <= text_len):
                 chunk_text = (chunk.get("text") or "").strip()
                 if chunk_text and full_text:
                     probe = chunk_text[:160]
@@ -666,24 +1071,26 @@ class DocumentProcessor:
                         end = found_at + len(probe)
                         search_cursor = found_at + len(probe)
 
-            pages = []
+            first_page = last_page = None
             if isinstance(start, int) and isinstance(end, int) and end > start:
-                for span in page_spans:
-                    overlap_start = max(start, span["start"])
-                    overlap_end = min(end, span["end"])
-                    if overlap_start < overlap_end:
-                        pages.append(span["page_number"])
+                # Spans are sorted and non-overlapping: the overlapping pages run
+                # from the first span ending after start to the last starting before end
+                first = bisect_right(ends, start)
+                last = bisect_left(starts, end) - 1
+                if first <= last:
+                    first_page = page_numbers[first]
+                    last_page = page_numbers[last]
 
             # Fallback to existing metadata if overlap matching failed.
-            if not pages:
+            if first_page is None:
                 fallback_page = metadata.get("page_number")
                 if isinstance(fallback_page, int) and fallback_page > 0:
-                    pages = [fallback_page]
+                    first_page = last_page = fallback_page
 
-            if pages:
-                metadata["page_number"] = pages[0]
-                metadata["page_start"] = pages[0]
-                metadata["page_end"] = pages[-1]
+            if first_page is not None:
+                metadata["page_number"] = first_page
+                metadata["page_start"] = first_page
+                metadata["page_end"] = last_page
 
     def _clean_text(self, text: str) -> str:
         """
@@ -695,25 +1102,25 @@ class DocumentProcessor:
         Returns:
             Cleaned text
         """
-        if not text:
+        # Blank pages (scans, separators) skip the regex passes entirely
+        if not text or text.isspace():
             return ""
 
         # Normalize line endings and keep line structure for section detection.
         text = text.replace("\r\n", "\n").replace("\r", "\n")
 
-        # Remove extra spaces/tabs while preserving newlines.
-        text = re.sub(r"[ \t]+", " ", text)
+        # Drop common PDF artifacts (null bytes, replacement characters)
+        text = text.replace("\x00", "").replace("\ufffd", "")
+
+        # Remove extra spaces/tabs while preserving newlines. Single spaces are
+        # left alone so the regex only rewrites runs that actually change.
+        text = _SPACE_RUN_RE.sub(" ", text.replace("\t", " "))
         text = "\n".join(line.strip() for line in text.split("\n"))
-        text = re.sub(r"\n{3,}", "\n\n", text)
 
         # Remove standalone page number lines (e.g., "Page 1", "1/10")
-        text = re.sub(r"(?im)^\s*Page\s+\d+\s*$", "", text)
-        text = re.sub(r"(?m)^\s*\d+/\d+\s*$", "", text)
-        
-        # Remove common PDF artifacts
-        text = re.sub(r'\x00', '', text)  # Null bytes
-        text = re.sub(r'\ufffd', '', text)  # Replacement characters
-        
+        text = _PAGE_NUMBER_LINE_RE.sub("", text)
+        text = _EXCESS_NEWLINES_RE.sub("\n\n", text)
+
         return text.strip()
     
     def extract_product_info(self, chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -736,68 +1143,143 @@ class DocumentProcessor:
             "contraindications": []
         }
         
-        full_text = " ".join(chunk["text"] for chunk in chunks)
-        
-        # Extract product name (usually in title or first chunk)
-        name_patterns = [
-            r'(?:Product|Name):\s*([A-Za-z®]+)',
-            r'([A-Z][a-z]+®)',  # Words with ® symbol
-        ]
-        for pattern in name_patterns:
-            match = re.search(pattern, full_text, re.IGNORECASE)
-            if match:
-                product_info["name"] = match.group(1)
-                break
-        
-        # Extract composition
-        comp_match = re.search(
-            r'(?:Composition|Contains?):\s*([^.]+)',
-            full_text,
-            re.IGNORECASE
-        )
-        if comp_match:
-            product_info["composition"] = comp_match.group(1).strip()
-        
-        # Extract dosing
-        dose_match = re.search(
-            r'(?:Dosing|Dose|Protocol):\s*([^.]+)',
-            full_text,
-            re.IGNORECASE
-        )
-        if dose_match:
-            product_info["dosing"] = dose_match.group(1).strip()
+        found = self._scan_product_fields(chunks)
+
+        # An explicit "Product:"/"Name:" label wins over a ®-marked word
+        product_info["name"] = found.get("name") or found.get("name_mark")
+        if "composition" in found:
+            product_info["composition"] = found["composition"].strip()
+        if "dosing" in found:
+            product_info["dosing"] = found["dosing"].strip()
         
         return product_info
 
+    @staticmethod
+    def _scan_product_fields(chunks: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Find the first value of each product field, stopping as soon as all are found
+
+        Chunks are scanned in order, so a name in the title chunk ends the scan
+        there instead of reading the rest of the document. Chunks end on
+        sentence boundaries, so field values are not cut off between chunks.
+
+        Args:
+            chunks: List of chunk dictionaries
+
+        Returns:
+            Dictionary of raw matched values keyed by _PRODUCT_INFO_RE group name
+        """
+        found = {}
+        missing = set(_PRODUCT_INFO_FIELDS)
+
+        for chunk in chunks:
+            for match in _PRODUCT_INFO_RE.finditer(chunk["text"]):
+                field = match.lastgroup
+                if field in found:
+                    continue
+                found[field] = match.group(field)
+                missing.discard(field)
+                if not missing:
+                    return found
+
+        return found
+
+
+def _get_page_text(page: "fitz.Page") -> str:
+    """
+    Raw text of one PDF page, before cleaning
+    """
+    # Plain text in content-stream order (no sort). Ligature glyphs are
+    # expanded ("ﬁ" -> "fi") so words match queries and embeddings.
+    return page.get_text(
+        "text",
+        flags=fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP,
+        sort=False
+    )
+
+
+def _extract_pages_worker(pdf_bytes: bytes, start: int, end: int) -> List[str]:
+    """
+    Read the raw text of pages [start, end) in a worker process
+
+    Module-level so it can be pickled by ProcessPoolExecutor.
+    """
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        return [_get_page_text(doc[page_num]) for page_num in range(start, end)]
+    finally:
+        doc.close()
+
+
+def _process_pdf_worker(
+    processor_config: Dict[str, Any],
+    file_path: str,
+    doc_id: str,
+    doc_type: Optional[str],
+    folder_name: Optional[str],
+    include_full_text: bool,
+    extract_tables: bool
+) -> Dict[str, Any]:
+    """
+    Process a single PDF in a worker process
+
+    Module-level so it can be pickled by ProcessPoolExecutor; builds a fresh
+    DocumentProcessor from the parent's config instead of pickling it.
+    """
+    # Documents already run in parallel here; don't nest a page-level pool
+    processor = DocumentProcessor(**{**processor_config, "page_workers": 1})
+    return processor.process_pdf(
+        file_path,
+        doc_id=doc_id,
+        doc_type=doc_type,
+        folder_name=folder_name,
+        include_full_text=include_full_text,
+        extract_tables=extract_tables
+    )
+
 
 class DocumentBatch:
     """
     Process multiple documents in batch
     """
     
-    def __init__(self, processor: DocumentProcessor = None):
+    def __init__(self, processor: DocumentProcessor = None, max_workers: int = None):
         """
         Args:
             processor: DocumentProcessor instance (creates new if None)
+            max_workers: Worker processes for batch processing (defaults to CPU count, 1 = sequential)
         """
         self.processor = processor or DocumentProcessor()
+        self.max_workers = max_workers or os.cpu_count() or 1
         self.results = []
+
+        # Summary counts, kept up to date as results are recorded
+        self._chunk_totals = Counter()
+        self._doc_types = Counter()
+        self._strategies = Counter()
     
     def process_directory(
         self,
         directory: str,
         doc_type: str = None,
         file_pattern: str = "*.pdf",
-        auto_detect_type: bool = True
+        auto_detect_type: bool = True,
+        include_full_text: bool = True,
+        extract_tables: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Process all PDFs in a directory with automatic type detection
 
+        Files are processed in parallel across worker processes; results keep
+        the order of the matched files.
+
         Args:
             directory: Path to directory
             doc_type: Type of documents (auto-detected from folder if None)
             file_pattern: Glob pattern for files
             auto_detect_type: Auto-detect document type from folder name
+            include_full_text: Keep each document's full text in its result
+            extract_tables: Run table extraction for each document
 
         Returns:
             List of processed document results
@@ -816,31 +1298,116 @@ class DocumentBatch:
         print(f"Found {len(pdf_files)} files in {directory}")
         print(f"Folder name for type detection: {folder_name}")
 
+        return self.process_files(
+            pdf_files,
+            doc_type=doc_type,
+            folder_name=folder_name if auto_detect_type else None,
+            include_full_text=include_full_text,
+            extract_tables=extract_tables
+        )
+
+    def process_files(
+        self,
+        pdf_files: List[Path],
+        doc_type: str = None,
+        folder_name: str = None,
+        include_full_text: bool = True,
+        extract_tables: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Process a list of PDFs, in parallel across worker processes
+
+        Args:
+            pdf_files: Paths of the PDFs to process
+            doc_type: Type of documents (auto-detected if None)
+            folder_name: Folder name for document type detection
+            include_full_text: Keep each document's full text in its result
+            extract_tables: Run table extraction for each document
+
+        Returns:
+            List of processed document results, in the order of pdf_files
+        """
+        pdf_files = [Path(pdf_file) for pdf_file in pdf_files]
+        outcomes: Dict[Path, Any] = {}
+
+        if self.max_workers <= 1 or len(pdf_files) <= 1:
+            # Read the next file on a background thread while this one is processed
+            with ThreadPoolExecutor(max_workers=1) as reader:
+                reads = [reader.submit(pdf_files[0].read_bytes)] if pdf_files else []
+
+                for index, pdf_file in enumerate(pdf_files):
+                    if index + 1 < len(pdf_files):
+                        reads.append(reader.submit(pdf_files[index + 1].read_bytes))
+
+                    try:
+                        outcomes[pdf_file] = self.processor.process_pdf(
+                            str(pdf_file),
+                            doc_id=pdf_file.stem,
+                            doc_type=doc_type,
+                            folder_name=folder_name,
+                            include_full_text=include_full_text,
+                            extract_tables=extract_tables,
+                            pdf_bytes=reads[index].result()
+                        )
+                    except Exception as e:
+                        outcomes[pdf_file] = e
+                    reads[index] = None  # Release the buffer
+        else:
+            processor_config = self.processor.get_config()
+            workers = min(self.max_workers, len(pdf_files))
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(
+                        _process_pdf_worker,
+                        processor_config,
+                        str(pdf_file),
+                        pdf_file.stem,
+                        doc_type,
+                        folder_name,
+                        include_full_text,
+                        extract_tables
+                    ): pdf_file
+                    for pdf_file in pdf_files
+                }
+
+                for future in as_completed(futures):
+                    try:
+                        outcomes[futures[future]] = future.result()
+                    except Exception as e:
+                        outcomes[futures[future]] = e
+
         results = []
+        self._chunk_totals = chunk_totals = Counter()
+        self._doc_types = doc_types = Counter()
+        self._strategies = strategies = Counter()
+
         for pdf_file in pdf_files:
-            try:
-                result = self.processor.process_pdf(
-                    str(pdf_file),
-                    doc_id=pdf_file.stem,
-                    doc_type=doc_type,
-                    folder_name=folder_name if auto_detect_type else None
-                )
+            outcome = outcomes[pdf_file]
+            if isinstance(outcome, Exception):
+                print(f"✗ Failed: {pdf_file.name} - {outcome}")
                 results.append({
-                    "success": True,
+                    "success": False,
                     "file": str(pdf_file),
-                    "detected_type": result.get("detected_type"),
-                    "chunking_strategy": result.get("chunking_strategy"),
-                    "result": result
+                    "error": str(outcome)
                 })
-                print(f"✓ Processed: {pdf_file.name} (type: {result.get('detected_type')}, strategy: {result.get('chunking_strategy')})")
-            except Exception as e:
-                print(f"✗ Failed: {pdf_file.name} - {e}")
+            else:
                 results.append({
-                    "success": False,
+                    "success": True,
                     "file": str(pdf_file),
-                    "error": str(e)
+                    "detected_type": outcome.get("detected_type"),
+                    "chunking_strategy": outcome.get("chunking_strategy"),
+                    "result": outcome
                 })
 
+                stats = outcome["stats"]
+                for key in _SUMMARY_CHUNK_STATS:
+                    chunk_totals[key] += stats.get(key, 0)
+                doc_types[outcome.get("detected_type")] += 1
+                strategies[outcome.get("chunking_strategy")] += 1
+
+                print(f"✓ Processed: {pdf_file.name} (type: {outcome.get('detected_type')}, strategy: {outcome.get('chunking_strategy')})")
+
         self.results = results
         return results
     
@@ -848,48 +1415,31 @@ class DocumentBatch:
         """
         Get summary statistics of batch processing
 
+        Counts are accumulated while process_files records results, so this
+        does not walk the results.
+
         Returns:
             Summary dictionary with hierarchical chunk breakdown
         """
         total = len(self.results)
-        successful = sum(1 for r in self.results if r["success"])
-        failed = total - successful
+        chunk_totals = self._chunk_totals
+        doc_types = self._doc_types
+        strategies = self._strategies
 
-        # Aggregate chunk statistics
-        total_chunks = 0
-        total_parent_chunks = 0
-        total_child_chunks = 0
-        total_flat_chunks = 0
-        doc_types = {}
-        strategies = {}
-
-        for r in self.results:
-            if r["success"]:
-                stats = r["result"]["stats"]
-                total_chunks += stats.get("num_chunks", 0)
-                total_parent_chunks += stats.get("num_parent_chunks", 0)
-                total_child_chunks += stats.get("num_child_chunks", 0)
-                total_flat_chunks += stats.get("num_flat_chunks", 0)
-
-                # Track document types
-                detected_type = r.get("detected_type", "unknown")
-                doc_types[detected_type] = doc_types.get(detected_type, 0) + 1
-
-                # Track chunking strategies
-                strategy = r.get("chunking_strategy", "unknown")
-                strategies[strategy] = strategies.get(strategy, 0) + 1
+        successful = sum(doc_types.values())
+        failed = total - successful
 
         return {
             "total_files": total,
             "successful": successful,
             "failed": failed,
-            "total_chunks": total_chunks,
+            "total_chunks": chunk_totals["num_chunks"],
             "chunk_breakdown": {
-                "parent_chunks": total_parent_chunks,
-                "child_chunks": total_child_chunks,
-                "flat_chunks": total_flat_chunks
+                "parent_chunks": chunk_totals["num_parent_chunks"],
+                "child_chunks": chunk_totals["num_child_chunks"],
+                "flat_chunks": chunk_totals["num_flat_chunks"]
             },
-            "document_types": doc_types,
-            "chunking_strategies": strategies,
+            "document_types": dict(doc_types),
+            "chunking_strategies": dict(strategies),
             "success_rate": successful / total if total > 0 else 0
         }
@@ -5,17 +5,72 @@ Tracks document versions, detects changes, and manages version history
 
 import hashlib
 import json
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import structlog
 
+try:
+    import orjson  # Optional: faster versions.json reads and writes
+except ImportError:
+    orjson = None
+
 logger = structlog.get_logger()
 
+# Version strings like "v2.1" (minor optional, further parts ignored)
+_VERSION_RE = re.compile(r"v*(?P<major>\d+)(?:\.(?P<minor>\d+)(?:\..*)?)?", re.DOTALL)
+
+# Journal entries appended before versions.json is rewritten and the journal cleared
+_COMPACT_EVERY = 100
+
+# Read size when hashing files without hashlib.file_digest
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+# Below this many files, hashing serially is cheaper than starting threads
+_PARALLEL_HASH_MIN_FILES = 4
+
+
+def _iter_pdfs(root: Path):
+    """
+    Yield paths of PDF files under root, recursively (like root.rglob("*.pdf"))
+
+    Paths are yielded as strings, exactly as os.path.join(root, ...) spells
+    them (Path() would normalize away a leading "./").
+
+    Uses os.scandir so directory entries are classified from the directory
+    listing itself rather than with a stat call per path. Like rglob, a
+    missing or unreadable directory is skipped rather than raising.
+    """
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".pdf") and entry.is_file():
+                    yield entry.path
+
 
 class DocumentVersion:
     """Represents a document version"""
 
+    # One object per version in every history; slots keep them small
+    __slots__ = (
+        "doc_id", "version", "file_path", "file_digest", "last_updated",
+        "supersedes", "metadata", "file_size", "file_mtime_ns"
+    )
+
     def __init__(
         self,
         doc_id: str,
@@ -24,15 +79,47 @@ class DocumentVersion:
         file_hash: str,
         last_updated: str,
         supersedes: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        file_size: Optional[int] = None,
+        file_mtime_ns: Optional[int] = None
     ):
-        self.doc_id = doc_id
+        # Every entry in a history shares its doc_id string
+        self.doc_id = sys.intern(doc_id)
         self.version = version
         self.file_path = file_path
         self.file_hash = file_hash
         self.last_updated = last_updated
         self.supersedes = supersedes
         self.metadata = metadata or {}
+        # File stat at registration, used to skip re-hashing untouched files
+        # (None for versions registered before these were recorded)
+        self.file_size = file_size
+        self.file_mtime_ns = file_mtime_ns
+
+    @property
+    def file_hash(self) -> str:
+        """SHA256 of the file as hex (stored as the raw 32-byte digest)"""
+        digest = self.file_digest
+        return digest.hex() if isinstance(digest, bytes) else digest
+
+    @file_hash.setter
+    def file_hash(self, file_hash: str):
+        try:
+            self.file_digest = bytes.fromhex(file_hash)
+        except (TypeError, ValueError):
+            # Not hex (e.g. a hand-edited entry): keep the stored value as is,
+            # so the record still loads and saves; it never equals a real
+            # digest, so the file is treated as changed
+            logger.warning("invalid_file_hash", doc_id=self.doc_id, file_hash=file_hash)
+            self.file_digest = file_hash
+
+    def matches_stat(self, stat_result: os.stat_result) -> bool:
+        """Check if a file's size and modification time match this version's file"""
+        return (
+            self.file_size is not None
+            and self.file_size == stat_result.st_size
+            and self.file_mtime_ns == stat_result.st_mtime_ns
+        )
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
@@ -43,7 +130,9 @@ class DocumentVersion:
             "file_hash": self.file_hash,
             "last_updated": self.last_updated,
             "supersedes": self.supersedes,
-            "metadata": self.metadata
+            "metadata": self.metadata,
+            "file_size": self.file_size,
+            "file_mtime_ns": self.file_mtime_ns
         }
 
     @classmethod
@@ -56,7 +145,9 @@ class DocumentVersion:
             file_hash=data["file_hash"],
             last_updated=data["last_updated"],
             supersedes=data.get("supersedes"),
-            metadata=data.get("metadata", {})
+            metadata=data.get("metadata", {}),
+            file_size=data.get("file_size"),
+            file_mtime_ns=data.get("file_mtime_ns")
         )
 
 
@@ -69,6 +160,10 @@ class DocumentVersionManager:
     - SHA256 hash-based change detection
     - Version history storage
     - Superseded version tracking
+
+    Storage: versions.json holds a snapshot of all histories, and each
+    registration is appended to versions.jsonl next to it. Loading replays the
+    journal over the snapshot; compact() folds it back into versions.json.
     """
 
     def __init__(self, version_db_path: Optional[Path] = None):
@@ -86,29 +181,38 @@ class DocumentVersionManager:
 
         self.version_db_path = Path(version_db_path)
         self.version_db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.journal_path = self.version_db_path.with_suffix(".jsonl")
+        self._journal_entries = 0
+        # Serializes registrations and writes (re-entrant: compact() saves)
+        self._lock = threading.RLock()
 
         # Load existing versions
         self.versions: Dict[str, List[DocumentVersion]] = self._load_versions()
 
     def _load_versions(self) -> Dict[str, List[DocumentVersion]]:
-        """Load versions from database"""
-        if not self.version_db_path.exists():
-            return {}
+        """Load versions from database (snapshot plus journal)"""
+        versions = {}
 
         try:
-            with open(self.version_db_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if self.version_db_path.exists():
+                if orjson is not None:
+                    data = orjson.loads(self.version_db_path.read_bytes())
+                else:
+                    with open(self.version_db_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+
+                for doc_id, version_list in data.items():
+                    versions[doc_id] = [
+                        DocumentVersion.from_dict(v) for v in version_list
+                    ]
 
-            versions = {}
-            for doc_id, version_list in data.items():
-                versions[doc_id] = [
-                    DocumentVersion.from_dict(v) for v in version_list
-                ]
+            self._replay_journal(versions)
 
             logger.info(
                 "versions_loaded",
                 document_count=len(versions),
-                total_versions=sum(len(v) for v in versions.values())
+                total_versions=sum(len(v) for v in versions.values()),
+                journal_entries=self._journal_entries
             )
 
             return versions
@@ -117,47 +221,195 @@ class DocumentVersionManager:
             logger.error("failed_to_load_versions", error=str(e))
             return {}
 
-    def _save_versions(self):
-        """Save versions to database"""
+    def _replay_journal(self, versions: Dict[str, List[DocumentVersion]]):
+        """Apply journaled registrations on top of the loaded snapshot"""
+        if not self.journal_path.exists():
+            return
+
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    entry = orjson.loads(line) if orjson is not None else json.loads(line)
+                except ValueError:
+                    # Torn final line from an interrupted append
+                    logger.warning("skipped_invalid_journal_entry", path=str(self.journal_path))
+                    continue
+
+                doc_version = DocumentVersion.from_dict(entry["version"])
+                history = versions.setdefault(entry["doc_id"], [])
+
+                # Entries already folded into the snapshot (interrupted compaction)
+                if any(
+                    v.version == doc_version.version and v.last_updated == doc_version.last_updated
+                    for v in history
+                ):
+                    continue
+
+                history.append(doc_version)
+                self._journal_entries += 1
+
+    def _append_to_journal(self, doc_version: DocumentVersion):
+        """Record one registration without rewriting versions.json"""
+        entry = {"doc_id": doc_version.doc_id, "version": doc_version.to_dict()}
+
         try:
-            data = {
-                doc_id: [v.to_dict() for v in version_list]
-                for doc_id, version_list in self.versions.items()
-            }
+            if orjson is not None:
+                line = orjson.dumps(entry, option=orjson.OPT_NON_STR_KEYS)
+            else:
+                line = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+
+            with open(self.journal_path, 'ab') as f:
+                f.write(line + b"\n")
 
-            with open(self.version_db_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self._journal_entries += 1
+
+        except Exception as e:
+            logger.error("failed_to_append_version", error=str(e))
+            # Fall back to a full save so the registration isn't lost
+            self.compact()
+            return
+
+        if self._journal_entries >= _COMPACT_EVERY:
+            self.compact()
+
+    def compact(self):
+        """Write all versions to versions.json and clear the journal"""
+        with self._lock:
+            if not self._save_versions():
+                return
+
+            try:
+                if self.journal_path.exists():
+                    self.journal_path.unlink()
+                self._journal_entries = 0
+
+            except Exception as e:
+                logger.error("failed_to_clear_version_journal", error=str(e))
+
+    def _save_versions(self) -> bool:
+        """Save versions to database (returns False if the write failed)"""
+        try:
+            # Write to a temp file and swap it in, so a crash mid-write
+            # never leaves a truncated versions.json behind
+            tmp_path = self.version_db_path.with_suffix(".json.tmp")
+
+            with self._lock:
+                data = {
+                    doc_id: [v.to_dict() for v in version_list]
+                    for doc_id, version_list in self.versions.items()
+                }
+
+                if orjson is not None:
+                    # Same layout as json.dump(indent=2, ensure_ascii=False)
+                    tmp_path.write_bytes(
+                        orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+                    )
+                else:
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        json.dump(data, f, indent=2, ensure_ascii=False)
+
+                os.replace(tmp_path, self.version_db_path)
 
             logger.debug("versions_saved", path=str(self.version_db_path))
+            return True
 
         except Exception as e:
             logger.error("failed_to_save_versions", error=str(e))
+            return False
 
     @staticmethod
-    def compute_file_hash(file_path: Path) -> str:
+    def compute_file_digest(file_path: Path) -> bytes:
         """
-        Compute SHA256 hash of a file
+        Compute SHA256 digest of a file
 
         Args:
             file_path: Path to file
 
         Returns:
-            Hexadecimal hash string
+            Raw 32-byte digest
         """
-        sha256 = hashlib.sha256()
+        return DocumentVersionManager.compute_file_digest_and_stat(file_path)[0]
 
+    @staticmethod
+    def compute_file_digest_and_stat(file_path: Path) -> Tuple[bytes, os.stat_result]:
+        """
+        Compute SHA256 digest of a file, with the file's stat from just before it was read
+
+        A write while the file is being hashed leaves the stat older than the
+        file, so the next stat comparison still sees a change.
+
+        Args:
+            file_path: Path to file
+
+        Returns:
+            Raw 32-byte digest and the stat
+        """
         try:
             with open(file_path, 'rb') as f:
-                # Read in chunks to handle large files
-                while chunk := f.read(8192):
-                    sha256.update(chunk)
+                file_stat = os.fstat(f.fileno())
 
-            return sha256.hexdigest()
+                if hasattr(hashlib, "file_digest"):  # Python 3.11+
+                    return hashlib.file_digest(f, "sha256").digest(), file_stat
+
+                # Read large blocks into one reused buffer. (Not mmap: a file
+                # truncated while mapped kills the process with SIGBUS.)
+                sha256 = hashlib.sha256()
+                buffer = bytearray(_HASH_BLOCK_SIZE)
+                view = memoryview(buffer)
+                while size := f.readinto(buffer):
+                    sha256.update(view[:size])
+
+            return sha256.digest(), file_stat
 
         except Exception as e:
             logger.error("failed_to_compute_hash", file=str(file_path), error=str(e))
             raise
 
+    @staticmethod
+    def compute_file_hash(file_path: Path) -> str:
+        """
+        Compute SHA256 hash of a file
+
+        Args:
+            file_path: Path to file
+
+        Returns:
+            Hexadecimal hash string
+        """
+        return DocumentVersionManager.compute_file_digest(file_path).hex()
+
+    def compute_file_digests(self, file_paths: List[Path]) -> List[bytes]:
+        """
+        Compute SHA256 digests of several files, in parallel
+
+        hashlib releases the GIL while hashing large buffers and file reads
+        release it too, so threads hash files concurrently without the cost
+        of worker processes.
+
+        Args:
+            file_paths: Paths to files
+
+        Returns:
+            Raw digests, in the order of file_paths
+        """
+        if len(file_paths) < _PARALLEL_HASH_MIN_FILES:
+            return [self.compute_file_digest(path) for path in file_paths]
+
+        with ThreadPoolExecutor(max_workers=min(len(file_paths), os.cpu_count() or 1)) as executor:
+            return list(executor.map(self.compute_file_digest, file_paths))
+
+    def compute_file_hashes(self, file_paths: List[Path]) -> List[str]:
+        """
+        Compute SHA256 hashes of several files, in parallel
+
+        Args:
+            file_paths: Paths to files
+
+        Returns:
+            Hexadecimal hash strings, in the order of file_paths
+        """
+        return [digest.hex() for digest in self.compute_file_digests(file_paths)]
+
     def get_current_version(self, doc_id: str) -> Optional[DocumentVersion]:
         """
         Get current (latest) version of a document
@@ -168,11 +420,10 @@ class DocumentVersionManager:
         Returns:
             Latest DocumentVersion or None if not found
         """
-        if doc_id not in self.versions or not self.versions[doc_id]:
-            return None
+        history = self.versions.get(doc_id)
 
         # Latest version is last in list
-        return self.versions[doc_id][-1]
+        return history[-1] if history else None
 
     def get_version_history(self, doc_id: str) -> List[DocumentVersion]:
         """
@@ -186,13 +437,19 @@ class DocumentVersionManager:
         """
         return self.versions.get(doc_id, [])
 
-    def has_changed(self, doc_id: str, file_path: Path) -> bool:
+    def has_changed(
+        self,
+        doc_id: str,
+        file_path: Path,
+        file_hash: Optional[str] = None
+    ) -> bool:
         """
         Check if a document has changed since last version
 
         Args:
             doc_id: Document identifier
             file_path: Path to current file
+            file_hash: Already computed hash of the file (computed if None)
 
         Returns:
             True if changed (or new document), False if unchanged
@@ -203,16 +460,45 @@ class DocumentVersionManager:
             # New document
             return True
 
-        # Compare hashes
-        current_hash = self.compute_file_hash(file_path)
-        return current_hash != current_version.file_hash
+        # Compare digests
+        if file_hash:
+            digest = bytes.fromhex(file_hash)
+        else:
+            # A different size means different contents; no need to hash
+            if self.has_size_changed(doc_id, file_path):
+                return True
+            digest = self.compute_file_digest(file_path)
+        return digest != current_version.file_digest
+
+    def has_size_changed(self, doc_id: str, file_path: Path) -> bool:
+        """
+        Check, without reading the file, if a document has certainly changed
+
+        Args:
+            doc_id: Document identifier
+            file_path: Path to current file
+
+        Returns:
+            True if new or its size differs from the last version's; False
+            if the file must be hashed to tell
+        """
+        current_version = self.get_current_version(doc_id)
+
+        if current_version is None:
+            return True
+
+        file_size = current_version.file_size
+        return file_size is not None and file_size != os.stat(file_path).st_size
 
     def register_version(
         self,
         doc_id: str,
         file_path: Path,
         version: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        file_hash: Optional[str] = None,
+        file_size: Optional[int] = None,
+        file_mtime_ns: Optional[int] = None
     ) -> DocumentVersion:
         """
         Register a new version of a document
@@ -222,55 +508,67 @@ class DocumentVersionManager:
             file_path: Path to document file
             version: Version string (e.g., "v2.1") - auto-generated if None
             metadata: Additional metadata
+            file_hash: Hash of the file's current contents, if already computed
+                (e.g. "new_hash" from detect_updates); computed if None
+            file_size: Size of the file when file_hash was computed, taken
+                before it was read (e.g. from compute_file_digest_and_stat)
+            file_mtime_ns: Modification time in ns, taken with file_size
 
         Returns:
             Created DocumentVersion
         """
-        # Compute file hash
-        file_hash = self.compute_file_hash(file_path)
-
-        # Get current version for supersedes tracking
-        current = self.get_current_version(doc_id)
-        supersedes = current.version if current else None
-
-        # Auto-generate version if not provided
-        if version is None:
-            if current is None:
-                version = "v1.0"
-            else:
-                # Parse version and increment
-                try:
-                    # Extract numeric parts from version (e.g., "v2.1" -> [2, 1])
-                    version_parts = current.version.lstrip('v').split('.')
-                    major, minor = int(version_parts[0]), int(version_parts[1]) if len(version_parts) > 1 else 0
-
-                    # Increment minor version
-                    minor += 1
-                    version = f"v{major}.{minor}"
-
-                except (ValueError, IndexError):
-                    # Fallback to timestamp-based version
-                    version = f"v_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
-
-        # Create version object
-        doc_version = DocumentVersion(
-            doc_id=doc_id,
-            version=version,
-            file_path=str(file_path),
-            file_hash=file_hash,
-            last_updated=datetime.utcnow().isoformat(),
-            supersedes=supersedes,
-            metadata=metadata or {}
-        )
+        # Compute file hash (unless the caller already has it), with the stat
+        # taken before reading so a write during hashing shows up as a change
+        if file_hash is None:
+            file_digest, file_stat = self.compute_file_digest_and_stat(file_path)
+            file_hash = file_digest.hex()
+            file_size, file_mtime_ns = file_stat.st_size, file_stat.st_mtime_ns
+        elif file_size is None or file_mtime_ns is None:
+            # A stat taken now could be newer than the caller's hash; without
+            # one, the next detect_updates hashes the file instead of trusting it
+            file_size = file_mtime_ns = None
+
+        with self._lock:
+            # Get current version for supersedes tracking
+            current = self.get_current_version(doc_id)
+            supersedes = current.version if current else None
+
+            # Auto-generate version if not provided
+            if version is None:
+                if current is None:
+                    version = "v1.0"
+                else:
+                    # Parse version and increment (e.g., "v2.1" -> "v2.2")
+                    match = _VERSION_RE.fullmatch(current.version)
+                    if match:
+                        # Increment minor version
+                        major, minor = int(match["major"]), int(match["minor"] or 0)
+                        version = f"v{major}.{minor + 1}"
+                    else:
+                        # Fallback to timestamp-based version
+                        version = f"v_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+
+            # Create version object
+            doc_version = DocumentVersion(
+                doc_id=doc_id,
+                version=version,
+                file_path=str(file_path),
+                file_hash=file_hash,
+                last_updated=datetime.utcnow().isoformat(),
+                supersedes=supersedes,
+                metadata=metadata or {},
+                file_size=file_size,
+                file_mtime_ns=file_mtime_ns
+            )
 
-        # Add to version history
-        if doc_id not in self.versions:
-            self.versions[doc_id] = []
+            # Add to version history
+            if doc_id not in self.versions:
+                self.versions[doc_id] = []
 
-        self.versions[doc_id].append(doc_version)
+            self.versions[doc_id].append(doc_version)
 
-        # Save to database
-        self._save_versions()
+            # Save to database
+            self._append_to_journal(doc_version)
 
         logger.info(
             "version_registered",
@@ -282,12 +580,20 @@ class DocumentVersionManager:
 
         return doc_version
 
-    def detect_updates(self, upload_dir: Path) -> Dict[str, Dict[str, Any]]:
+    def detect_updates(
+        self,
+        upload_dir: Path,
+        force_rehash: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
         """
         Scan upload directory and detect document updates
 
+        Files whose size and modification time still match their current
+        version are reported unchanged without being read.
+
         Args:
             upload_dir: Directory containing uploaded PDFs
+            force_rehash: Hash every file, even if its stat is unchanged
 
         Returns:
             Dictionary with update info:
@@ -295,8 +601,11 @@ class DocumentVersionManager:
                 "new": [doc_ids...],
                 "updated": [doc_ids...],
                 "unchanged": [doc_ids...],
-                "details": {doc_id: {old_hash, new_hash, file_path}}
+                "details": {doc_id: {old_hash, new_hash, file_path, ...}}
             }
+
+            New and updated details also carry file_size and file_mtime_ns,
+            taken before new_hash was computed, for register_version.
         """
         new_docs = []
         updated_docs = []
@@ -304,15 +613,37 @@ class DocumentVersionManager:
         details = {}
 
         # Scan all PDFs in upload directory (recursive)
-        pdf_files = list(upload_dir.rglob("*.pdf"))
+        pdf_files = list(_iter_pdfs(upload_dir))
+
+        # Paths from _iter_pdfs all start with upload_dir joined to a name and
+        # end in ".pdf", so the relative path without extension is a plain slice
+        prefix_len = len(os.path.join(upload_dir, ""))
 
-        for pdf_path in pdf_files:
+        scanned = []
+        to_hash = []
+        for raw_path in pdf_files:
             # Use relative path as doc_id (without .pdf extension)
-            relative_path = pdf_path.relative_to(upload_dir)
-            doc_id = str(relative_path.with_suffix('')).replace('/', '_')
+            doc_id = raw_path[prefix_len:-4].replace('/', '_')
+            pdf_path = Path(raw_path)
 
             current_version = self.get_current_version(doc_id)
-            new_hash = self.compute_file_hash(pdf_path)
+            # Taken before hashing, so it never describes newer contents than the hash
+            file_stat = pdf_path.stat()
+            stat_unchanged = (
+                not force_rehash
+                and current_version is not None
+                and current_version.matches_stat(file_stat)
+            )
+            scanned.append((pdf_path, doc_id, current_version, file_stat, stat_unchanged))
+            if not stat_unchanged:
+                to_hash.append(pdf_path)
+
+        # Only files whose stat changed (or new files) are read and hashed
+        file_digests = dict(zip(to_hash, self.compute_file_digests(to_hash)))
+
+        for pdf_path, doc_id, current_version, file_stat, stat_unchanged in scanned:
+            new_digest = current_version.file_digest if stat_unchanged else file_digests[pdf_path]
+            new_hash = new_digest.hex()
 
             if current_version is None:
                 # New document
@@ -321,9 +652,11 @@ class DocumentVersionManager:
                     "status": "new",
                     "old_hash": None,
                     "new_hash": new_hash,
-                    "file_path": str(pdf_path)
+                    "file_path": str(pdf_path),
+                    "file_size": file_stat.st_size,
+                    "file_mtime_ns": file_stat.st_mtime_ns
                 }
-            elif new_hash != current_version.file_hash:
+            elif new_digest != current_version.file_digest:
                 # Updated document
                 updated_docs.append(doc_id)
                 details[doc_id] = {
@@ -331,7 +664,9 @@ class DocumentVersionManager:
                     "old_hash": current_version.file_hash,
                     "new_hash": new_hash,
                     "old_version": current_version.version,
-                    "file_path": str(pdf_path)
+                    "file_path": str(pdf_path),
+                    "file_size": file_stat.st_size,
+                    "file_mtime_ns": file_stat.st_mtime_ns
                 }
             else:
                 # Unchanged document
@@ -348,6 +683,7 @@ class DocumentVersionManager:
             new=len(new_docs),
             updated=len(updated_docs),
             unchanged=len(unchanged_docs),
+            hashed=len(to_hash),
             total=len(pdf_files)
         )
 
@@ -400,7 +736,7 @@ class DocumentVersionManager:
             })
 
         # Sort by last updated (newest first)
-        documents.sort(key=lambda x: x["last_updated"], reverse=True)
+        documents.sort(key=itemgetter("last_updated"), reverse=True)
 
         return {
             "generated_at": datetime.utcnow().isoformat(),
@@ -5,17 +5,99 @@ Implements document-type specific chunking for optimal retrieval
 
 import re
 import uuid
+from bisect import bisect_right
+from collections import deque
+from itertools import chain
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from abc import ABC, abstractmethod
 import structlog
 
+from app.utils.chunking import DATACLASS_SLOTS
 # Import protocol-aware chunker for improved protocol handling
 from app.utils.protocol_chunking import ProtocolAwareChunkerAdapter
 
 logger = structlog.get_logger()
 
+# Characters replaced with "_" when a doc_id becomes part of a chunk id
+_CHUNK_ID_UNSAFE_RE = re.compile(r'[^a-zA-Z0-9]')
+
+# Periods that do not end a sentence, masked before splitting (in this order)
+_DECIMAL_RE = re.compile(r'(\d+)\.\s*(\d+)')
+# Title and medical abbreviations in one pass. The lookahead on the first
+# letter lets the scan skip most positions without trying each alternative.
+_ABBR_RE = re.compile(
+    r'(?=[dmpeviac])(Dr|Mrs?|Ms|Prof|etc|vs|i\.e|e\.g|\b(?:ca|approx|cf|incl|Inc))\.\s',
+    re.IGNORECASE
+)
+_DOSAGE_ABBR_RE = re.compile(r'(\d+)\s*(mg|ml|cc|g|mcg|µg)\.\s', re.IGNORECASE)
+_PRODUCT_ABBR_RE = re.compile(r'([A-Z][a-z]+)\s+(Plus|Eye|Hair)®?\.\s')
+_SENTENCE_BOUNDARY_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Masking passes, applied in order: (pattern, replacement template, the same
+# replacement as a format string over the match groups)
+_SENTENCE_MASKS = (
+    # Common abbreviations in medical text
+    (_DECIMAL_RE, r'\1<DECIMAL>\2', '{}<DECIMAL>{}'),
+    (_ABBR_RE, r'\1<ABBR> ', '{}<ABBR> '),
+    # Medical dosage notations
+    (_DOSAGE_ABBR_RE, r'\1 \2<ABBR> ', '{} {}<ABBR> '),
+    # Product names with special characters (e.g., "Newest®")
+    (_PRODUCT_ABBR_RE, r'\1 \2®<ABBR> ', '{} {}®<ABBR> '),
+)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+
+# Paragraph openings that signal a topic change (AdaptiveChunker)
+_SEMANTIC_BREAK_RE = re.compile(
+    r'^(?:However|Nevertheless|In contrast|On the other hand)'
+    r'|^(?:Furthermore|Moreover|Additionally|In addition)'
+    r'|^(?:Case \d+|Patient \d+|Example \d+)'
+    r'|^(?:Results|Discussion|Conclusion|Summary)'
+    r'|^\d+\.',  # Numbered items
+    re.IGNORECASE
+)
+
+
+def _sub_with_shifts(
+    pattern: re.Pattern,
+    replacement_format: str,
+    text: str
+) -> Tuple[str, Tuple[List[int], List[int]]]:
+    """
+    pattern.sub() with a format string over the match groups, also recording
+    how far each replacement moved the rest of the text
+
+    Returns:
+        The new text and (ends, shifts): for each replacement, where it ends
+        in the new text and the total length change up to and including it
+    """
+    ends = []
+    shifts = []
+    shift = 0
+
+    def replace(match: re.Match) -> str:
+        nonlocal shift
+        # (format() rather than match.expand(), which re-parses its template)
+        replacement = replacement_format.format(*match.groups())
+        shift += len(replacement) - (match.end() - match.start())
+        ends.append(match.end() + shift)
+        shifts.append(shift)
+        return replacement
+
+    return pattern.sub(replace, text), (ends, shifts)
+
+
+def _unshift(position: int, layers: List[Tuple[List[int], List[int]]]) -> int:
+    """Map a position outside any replacement back through _sub_with_shifts layers"""
+    for ends, shifts in reversed(layers):
+        i = bisect_right(ends, position)
+        if i:
+            position -= shifts[i - 1]
+    return position
+
 
 class ChunkType(Enum):
     """Types of chunks in the hierarchy"""
@@ -36,7 +118,7 @@ class DocumentType(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class HierarchicalChunk:
     """Represents a chunk with hierarchical relationships"""
     id: str
@@ -80,35 +162,68 @@ class BaseChunker(ABC):
     def _generate_chunk_id(self, doc_id: str, prefix: str = "chunk") -> str:
         """Generate unique chunk ID"""
         short_uuid = str(uuid.uuid4())[:8]
-        safe_doc_id = re.sub(r'[^a-zA-Z0-9]', '_', doc_id)[:50]
+        safe_doc_id = _CHUNK_ID_UNSAFE_RE.sub('_', doc_id)[:50]
         return f"{safe_doc_id}_{prefix}_{short_uuid}"
 
     def _split_into_sentences(self, text: str) -> List[str]:
         """Split text into sentences"""
-        # Handle common abbreviations in medical text
-        text = re.sub(r'(\d+)\.\s*(\d+)', r'\1<DECIMAL>\2', text)
-        text = re.sub(r'(Dr|Mr|Mrs|Ms|Prof|etc|vs|i\.e|e\.g)\.\s', r'\1<ABBR> ', text, flags=re.IGNORECASE)
-
-        # Handle medical dosage notations
-        text = re.sub(r'(\d+)\s*(mg|ml|cc|g|mcg|µg)\.\s', r'\1 \2<ABBR> ', text, flags=re.IGNORECASE)
-
-        # Handle medical abbreviations
-        text = re.sub(r'\b(ca|approx|vs|cf|incl|Inc)\.\s', r'\1<ABBR> ', text, flags=re.IGNORECASE)
+        # Mask periods that don't end a sentence
+        for pattern, template, _ in _SENTENCE_MASKS:
+            text = pattern.sub(template, text)
+
+        # Split on sentence boundaries, dropping blanks and restoring
+        # abbreviations in the same pass
+        return [
+            sentence.replace('<DECIMAL>', '.').replace('<ABBR>', '.')
+            for sentence in map(str.strip, _SENTENCE_BOUNDARY_RE.split(text))
+            if sentence
+        ]
 
-        # Handle product names with special characters (e.g., "Newest®")
-        text = re.sub(r'([A-Z][a-z]+)\s+(Plus|Eye|Hair)®?\.\s', r'\1 \2®<ABBR> ', text)
+    def _split_into_sentence_spans(self, text: str) -> List[Tuple[str, int, int]]:
+        """
+        Split text into sentences along with their character offsets
 
-        # Split on sentence boundaries
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        Sentences are the same as _split_into_sentences. Masking rewrites some
+        text (e.g. "2. 5" becomes "2.5"), so each pass records its shifts and
+        sentence boundaries, which masking never touches, are mapped back
+        through them.
 
-        # Restore abbreviations
-        sentences = [s.replace('<DECIMAL>', '.').replace('<ABBR>', '.') for s in sentences]
+        Returns:
+            List of (sentence, char_start, char_end) tuples
+        """
+        masked = text
+        layers = []
+        for pattern, _, replacement_format in _SENTENCE_MASKS:
+            masked, layer = _sub_with_shifts(pattern, replacement_format, masked)
+            if layer[0]:
+                layers.append(layer)
+
+        pieces = []
+        start = 0
+        for boundary in _SENTENCE_BOUNDARY_RE.finditer(masked):
+            pieces.append((start, boundary.start()))
+            start = boundary.end()
+
+        # Only the first piece can start, and only the last end, with whitespace
+        pieces.append((start, len(masked)))
+        text_end = len(text.rstrip())
+
+        spans = []
+        for start, end in pieces:
+            raw = masked[start:end]
+            sentence = raw.strip()
+            if sentence:
+                spans.append((
+                    sentence.replace('<DECIMAL>', '.').replace('<ABBR>', '.'),
+                    _unshift(start, layers) + len(raw) - len(raw.lstrip()),
+                    min(_unshift(end, layers), text_end)
+                ))
 
-        return [s.strip() for s in sentences if s.strip()]
+        return spans
 
     def _clean_text(self, text: str) -> str:
         """Clean text for chunking"""
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         text = text.strip()
         return text
 
@@ -134,6 +249,10 @@ class HierarchicalChunker(BaseChunker):
         r'^[A-Z][A-Z\s]{2,50}$',  # ALL CAPS headers
     ]
 
+    # All section header patterns as one alternation, so each line is
+    # tested with a single match call
+    _SECTION_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in SECTION_PATTERNS))
+
     def __init__(
         self,
         parent_chunk_size: int = 2000,
@@ -155,13 +274,16 @@ class HierarchicalChunker(BaseChunker):
         # Detect and split by sections
         sections = self._detect_sections(text)
 
-        for section_name, section_text in sections:
+        for section_name, section_text, section_start, section_end in sections:
             if len(section_text.strip()) < self.min_chunk_size:
                 continue
 
             # Create parent chunk for section
             parent_id = self._generate_chunk_id(doc_id, f"section_{section_name[:20]}")
-            parent_text = self._create_section_summary(section_name, section_text)
+
+            # Split once for both the summary and the child chunks
+            sentences = self._split_into_sentence_spans(section_text)
+            parent_text = self._create_section_summary(section_name, sentences)
 
             parent_chunk = HierarchicalChunk(
                 id=parent_id,
@@ -171,13 +293,14 @@ class HierarchicalChunker(BaseChunker):
                 doc_type=doc_type,
                 section=section_name,
                 metadata={**metadata, "section": section_name},
-                char_start=text.find(section_text[:50]) if section_text else 0,
-                char_end=text.find(section_text[:50]) + len(section_text) if section_text else 0
+                char_start=section_start,
+                char_end=section_end
             )
 
             # Create child chunks for details
             child_chunks = self._create_child_chunks(
-                section_text, doc_id, doc_type, parent_id, section_name, metadata
+                sentences, doc_id, doc_type, parent_id, section_name, metadata,
+                char_offset=section_start
             )
 
             # Link parent to children
@@ -188,80 +311,97 @@ class HierarchicalChunker(BaseChunker):
 
         return all_chunks
 
-    def _detect_sections(self, text: str) -> List[Tuple[str, str]]:
-        """Detect sections in text based on headers"""
+    def _detect_sections(self, text: str) -> List[Tuple[str, str, int, int]]:
+        """
+        Detect sections in text based on headers
+
+        Returns:
+            List of (section_name, section_text, char_start, char_end) tuples,
+            where text[char_start:char_end] == section_text
+        """
         sections = []
         current_section = "Introduction"
         current_text = []
 
         lines = text.split('\n')
 
+        # Offset of the current line, and of the current section's first line
+        offset = 0
+        section_start = 0
+
         for line in lines:
             line_stripped = line.strip()
 
             # Check if this line is a section header
-            is_header = False
-            for pattern in self.SECTION_PATTERNS:
-                if re.match(pattern, line_stripped):
-                    # Save previous section
-                    if current_text:
-                        sections.append((current_section, '\n'.join(current_text)))
-
-                    # Start new section
-                    current_section = line_stripped.title()
-                    current_text = []
-                    is_header = True
-                    break
-
-            if not is_header:
+            if self._SECTION_RE.match(line_stripped):
+                # Save previous section (ends before this line's preceding newline)
+                if current_text:
+                    sections.append((current_section, '\n'.join(current_text), section_start, offset - 1))
+
+                # Start new section
+                current_section = line_stripped.title()
+                current_text = []
+                section_start = offset + len(line) + 1
+            else:
                 current_text.append(line)
 
+            offset += len(line) + 1
+
         # Add final section
         if current_text:
-            sections.append((current_section, '\n'.join(current_text)))
+            sections.append((current_section, '\n'.join(current_text), section_start, len(text)))
 
         # If no sections detected, treat entire text as one section
         if not sections:
-            sections = [("Content", text)]
+            sections = [("Content", text, 0, len(text))]
 
         return sections
 
-    def _create_section_summary(self, section_name: str, section_text: str) -> str:
-        """Create a summary text for the parent chunk"""
+    def _create_section_summary(
+        self,
+        section_name: str,
+        sentences: List[Tuple[str, int, int]]
+    ) -> str:
+        """Create a summary text for the parent chunk from the section's sentence spans"""
         # Take first few sentences as summary (up to parent_chunk_size)
-        sentences = self._split_into_sentences(section_text)
-
-        summary_text = f"[{section_name}] "
-        for sentence in sentences:
-            if len(summary_text) + len(sentence) > self.parent_chunk_size:
+        parts = [f"[{section_name}]"]
+        total_length = len(parts[0])
+        for sentence, _, _ in sentences:
+            if total_length + len(sentence) + 1 > self.parent_chunk_size:
                 break
-            summary_text += sentence + " "
+            parts.append(sentence)
+            total_length += len(sentence) + 1
 
-        return summary_text.strip()
+        return " ".join(parts).strip()
 
     def _create_child_chunks(
         self,
-        text: str,
+        sentences: List[Tuple[str, int, int]],
         doc_id: str,
         doc_type: str,
         parent_id: str,
         section_name: str,
-        metadata: Dict[str, Any]
+        metadata: Dict[str, Any],
+        char_offset: int = 0
     ) -> List[HierarchicalChunk]:
-        """Create child chunks with overlap"""
+        """
+        Create child chunks with overlap
+
+        Args:
+            sentences: Sentence spans of the section (_split_into_sentence_spans)
+            char_offset: Offset of the section in the document, added to chunk offsets
+        """
         chunks = []
-        sentences = self._split_into_sentences(text)
 
-        current_chunk = []
+        current_chunk = deque()  # (sentence, char_start, char_end)
         current_length = 0
-        char_position = 0
 
-        for sentence in sentences:
+        for sentence, start, end in sentences:
             sentence_length = len(sentence)
 
             if current_length + sentence_length > self.child_chunk_size and current_chunk:
                 # Create chunk
-                chunk_text = ' '.join(current_chunk)
+                chunk_text = ' '.join(s for s, _, _ in current_chunk)
                 chunk_id = self._generate_chunk_id(doc_id, "detail")
 
                 chunks.append(HierarchicalChunk(
@@ -273,23 +413,20 @@ class HierarchicalChunker(BaseChunker):
                     parent_id=parent_id,
                     section=section_name,
                     metadata={**metadata, "section": section_name},
-                    char_start=char_position - current_length,
-                    char_end=char_position
+                    char_start=char_offset + current_chunk[0][1],
+                    char_end=char_offset + current_chunk[-1][2]
                 ))
 
-                # Keep overlap
-                overlap_text = chunk_text[-self.child_overlap:] if len(chunk_text) > self.child_overlap else chunk_text
-                overlap_sentences = self._split_into_sentences(overlap_text)
-                current_chunk = overlap_sentences
-                current_length = sum(len(s) + 1 for s in overlap_sentences)
+                # Keep trailing sentences that fit in the overlap for context
+                while current_chunk and current_length > self.child_overlap:
+                    current_length -= len(current_chunk.popleft()[0]) + 1
 
-            current_chunk.append(sentence)
+            current_chunk.append((sentence, start, end))
             current_length += sentence_length + 1
-            char_position += sentence_length + 1
 
         # Final chunk
         if current_chunk and current_length >= self.min_chunk_size:
-            chunk_text = ' '.join(current_chunk)
+            chunk_text = ' '.join(s for s, _, _ in current_chunk)
             chunk_id = self._generate_chunk_id(doc_id, "detail")
 
             chunks.append(HierarchicalChunk(
@@ -301,8 +438,8 @@ class HierarchicalChunker(BaseChunker):
                 parent_id=parent_id,
                 section=section_name,
                 metadata={**metadata, "section": section_name},
-                char_start=char_position - current_length,
-                char_end=char_position
+                char_start=char_offset + current_chunk[0][1],
+                char_end=char_offset + current_chunk[-1][2]
             ))
 
         return chunks
@@ -351,24 +488,28 @@ class AdaptiveChunker(BaseChunker):
         metadata = metadata or {}
         chunks = []
 
-        # Split into paragraphs first
-        paragraphs = self._split_into_paragraphs(text)
+        # Split into paragraphs first, keeping their offsets in the source text
+        paragraphs = self._split_into_paragraph_spans(text)
 
+        # (paragraph, segments): segments map runs of the paragraph text back to
+        # the source as (text_offset, char_start, length), so carried overlap
+        # text keeps exact offsets
         current_chunk = []
         current_length = 0
-        char_position = 0
 
-        for i, paragraph in enumerate(paragraphs):
+        for paragraph, start, end in paragraphs:
             para_length = len(paragraph)
 
-            # Check for semantic break (topic change indicators)
+            # Check for semantic break (topic change indicators); only the last
+            # few paragraphs are used as context
             is_break = self._detect_semantic_break(
-                current_chunk, paragraph
+                [p for p, _ in current_chunk[-3:]], paragraph
             ) if current_chunk else False
 
             # Create chunk if size exceeded or semantic break
             if (current_length + para_length > self.chunk_size or is_break) and current_chunk:
-                chunk_text = '\n\n'.join(current_chunk)
+                chunk_text = '\n\n'.join(p for p, _ in current_chunk)
+                segments = self._join_segments(current_chunk)
 
                 if len(chunk_text) >= self.min_chunk_size:
                     chunk_id = self._generate_chunk_id(doc_id, "adaptive")
@@ -384,26 +525,27 @@ class AdaptiveChunker(BaseChunker):
                         doc_type=doc_type,
                         section=section,
                         metadata={**metadata, "section": section},
-                        char_start=char_position - current_length,
-                        char_end=char_position
+                        char_start=segments[0][1],
+                        char_end=segments[-1][1] + segments[-1][2]
                     ))
 
                 # Start new chunk with overlap
                 if self.overlap > 0 and current_chunk:
                     overlap_text = chunk_text[-self.overlap:]
-                    current_chunk = [overlap_text]
+                    overlap_segments = self._tail_segments(segments, len(chunk_text) - len(overlap_text))
+                    current_chunk = [(overlap_text, overlap_segments)]
                     current_length = len(overlap_text)
                 else:
                     current_chunk = []
                     current_length = 0
 
-            current_chunk.append(paragraph)
+            current_chunk.append((paragraph, [(0, start, end - start)]))
             current_length += para_length + 2  # +2 for paragraph separator
-            char_position += para_length + 2
 
         # Final chunk
         if current_chunk:
-            chunk_text = '\n\n'.join(current_chunk)
+            chunk_text = '\n\n'.join(p for p, _ in current_chunk)
+            segments = self._join_segments(current_chunk)
             if len(chunk_text) >= self.min_chunk_size:
                 chunk_id = self._generate_chunk_id(doc_id, "adaptive")
                 section = self._detect_section_from_content(chunk_text)
@@ -416,16 +558,56 @@ class AdaptiveChunker(BaseChunker):
                     doc_type=doc_type,
                     section=section,
                     metadata={**metadata, "section": section},
-                    char_start=char_position - current_length,
-                    char_end=char_position
+                    char_start=segments[0][1],
+                    char_end=segments[-1][1] + segments[-1][2]
                 ))
 
         return chunks
 
     def _split_into_paragraphs(self, text: str) -> List[str]:
         """Split text into paragraphs"""
-        paragraphs = re.split(r'\n\s*\n', text)
-        return [p.strip() for p in paragraphs if p.strip()]
+        return [paragraph for paragraph, _, _ in self._split_into_paragraph_spans(text)]
+
+    def _split_into_paragraph_spans(self, text: str) -> List[Tuple[str, int, int]]:
+        """
+        Split text into paragraphs along with their character offsets
+
+        Returns:
+            List of (paragraph, char_start, char_end) tuples
+        """
+        spans = []
+        start = 0
+        for separator in chain(_PARAGRAPH_BREAK_RE.finditer(text), (None,)):
+            end = separator.start() if separator else len(text)
+            raw = text[start:end]
+            paragraph = raw.strip()
+            if paragraph:
+                paragraph_start = start + len(raw) - len(raw.lstrip())
+                spans.append((paragraph, paragraph_start, paragraph_start + len(paragraph)))
+            if separator:
+                start = separator.end()
+
+        return spans
+
+    @staticmethod
+    def _join_segments(units: List[Tuple[str, List[Tuple[int, int, int]]]]) -> List[Tuple[int, int, int]]:
+        """Source segments of the units' joined chunk text, as (text_offset, char_start, length)"""
+        segments = []
+        text_offset = 0
+        for unit_text, unit_segments in units:
+            segments.extend((text_offset + offset, start, length) for offset, start, length in unit_segments)
+            text_offset += len(unit_text) + 2
+        return segments
+
+    @staticmethod
+    def _tail_segments(segments: List[Tuple[int, int, int]], text_offset: int) -> List[Tuple[int, int, int]]:
+        """Source segments of the joined text from text_offset on, re-based to start at 0"""
+        tail = []
+        for offset, start, length in segments:
+            cut = max(0, text_offset - offset)
+            if cut < length:
+                tail.append((offset + cut - text_offset, start + cut, length - cut))
+        return tail
 
     def _detect_semantic_break(self, current_chunks: List[str], next_paragraph: str) -> bool:
         """
@@ -441,17 +623,8 @@ class AdaptiveChunker(BaseChunker):
             True if semantic break detected
         """
         # First check heuristic indicators (fast, cheap)
-        break_indicators = [
-            r'^(?:However|Nevertheless|In contrast|On the other hand)',
-            r'^(?:Furthermore|Moreover|Additionally|In addition)',
-            r'^(?:Case \d+|Patient \d+|Example \d+)',
-            r'^(?:Results|Discussion|Conclusion|Summary)',
-            r'^\d+\.',  # Numbered items
-        ]
-
-        for pattern in break_indicators:
-            if re.match(pattern, next_paragraph, re.IGNORECASE):
-                return True
+        if _SEMANTIC_BREAK_RE.match(next_paragraph):
+            return True
 
         # If semantic similarity enabled, use embeddings for refined detection
         if self.use_semantic_similarity and self._semantic_service:
@@ -518,6 +691,9 @@ class StepAwareChunker(BaseChunker):
         r'^(?:\d+\)|[a-z]\)|•|→|-)\s+',
     ]
 
+    # All step patterns as one alternation (see HierarchicalChunker._SECTION_RE)
+    _STEP_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in STEP_PATTERNS), re.IGNORECASE)
+
     def __init__(
         self,
         chunk_size: int = 600,
@@ -632,10 +808,7 @@ class StepAwareChunker(BaseChunker):
 
     def _is_step_start(self, text: str) -> bool:
         """Check if text starts a new step"""
-        for pattern in self.STEP_PATTERNS:
-            if re.match(pattern, text, re.IGNORECASE):
-                return True
-        return False
+        return self._STEP_RE.match(text) is not None
 
 
 class SectionBasedChunker(BaseChunker):
@@ -661,6 +834,26 @@ class SectionBasedChunker(BaseChunker):
         "mechanism": ["mechanism of action", "how it works", "mode of action"],
     }
 
+    # Protocol information patterns (reused from ProtocolAwareChunker),
+    # compiled once and keyed by the metadata field they fill
+    _PROTOCOL_RES = {
+        'protocol_sessions': [re.compile(pattern) for pattern in (
+            r'\d+[-–]\d+\s+(?:total\s+)?sessions?',
+            r'total\s+of\s+\d+\s+sessions?',
+            r'for\s+(?:a\s+)?total\s+of\s+\d+\s+sessions?',
+            r'\d+\s+sessions?',
+        )],
+        'protocol_frequency': [re.compile(pattern) for pattern in (
+            r'every\s+\d+[-–]?\d*\s+(?:day|week|month)s?',
+            r'once\s+(?:per|a)\s+(?:week|month)',
+            r'\d+\s+times?\s+(?:per|a)\s+(?:week|month)',
+        )],
+        'protocol_dosage': [re.compile(pattern) for pattern in (
+            r'\d+(?:\.\d+)?\s*ml(?:\s+per\s+session)?',
+            r'\d+(?:\.\d+)?\s*mg',
+        )],
+    }
+
     def __init__(
         self,
         chunk_size: int = 600,
@@ -671,6 +864,12 @@ class SectionBasedChunker(BaseChunker):
         self.min_chunk_size = min_chunk_size
         self.section_headers = section_headers or self.DEFAULT_SECTIONS
 
+        # Section split pattern, built once per chunker
+        section_pattern = '|'.join(
+            re.escape(header) for header in self.section_headers
+        )
+        self._section_split_re = re.compile(rf'(?i)({section_pattern})\s*[:.]?\s*')
+
     def _match_section_header(self, text: str) -> Optional[str]:
         """Match text against section headers with variations"""
         text_lower = text.lower().strip()
@@ -695,45 +894,13 @@ class SectionBasedChunker(BaseChunker):
         protocol_meta = {}
         text_lower = text.lower()
 
-        # Protocol information patterns (reused from ProtocolAwareChunker)
-        PROTOCOL_PATTERNS = {
-            'sessions': [
-                r'\d+[-–]\d+\s+(?:total\s+)?sessions?',
-                r'total\s+of\s+\d+\s+sessions?',
-                r'for\s+(?:a\s+)?total\s+of\s+\d+\s+sessions?',
-                r'\d+\s+sessions?',
-            ],
-            'frequency': [
-                r'every\s+\d+[-–]?\d*\s+(?:day|week|month)s?',
-                r'once\s+(?:per|a)\s+(?:week|month)',
-                r'\d+\s+times?\s+(?:per|a)\s+(?:week|month)',
-            ],
-            'dosage': [
-                r'\d+(?:\.\d+)?\s*ml(?:\s+per\s+session)?',
-                r'\d+(?:\.\d+)?\s*mg',
-            ],
-        }
-
-        # Extract sessions
-        for pattern in PROTOCOL_PATTERNS['sessions']:
-            match = re.search(pattern, text_lower)
-            if match:
-                protocol_meta['protocol_sessions'] = match.group(0)
-                break
-
-        # Extract frequency
-        for pattern in PROTOCOL_PATTERNS['frequency']:
-            match = re.search(pattern, text_lower)
-            if match:
-                protocol_meta['protocol_frequency'] = match.group(0)
-                break
-
-        # Extract dosage
-        for pattern in PROTOCOL_PATTERNS['dosage']:
-            match = re.search(pattern, text_lower)
-            if match:
-                protocol_meta['protocol_dosage'] = match.group(0)
-                break
+        # First matching pattern of each kind wins
+        for meta_key, patterns in self._PROTOCOL_RES.items():
+            for pattern in patterns:
+                match = pattern.search(text_lower)
+                if match:
+                    protocol_meta[meta_key] = match.group(0)
+                    break
 
         if protocol_meta:
             protocol_meta['has_protocol_info'] = True
@@ -746,14 +913,8 @@ class SectionBasedChunker(BaseChunker):
         metadata = metadata or {}
         chunks = []
 
-        # Build section pattern
-        section_pattern = '|'.join(
-            re.escape(header) for header in self.section_headers
-        )
-        pattern = rf'(?i)({section_pattern})\s*[:.]?\s*'
-
         # Split by sections
-        parts = re.split(pattern, text)
+        parts = self._section_split_re.split(text)
 
         current_section = "Overview"
 
@@ -942,6 +1103,12 @@ class ChunkingStrategyFactory:
         ],
     }
 
+    # Detection patterns compiled once, in the same order
+    _DOC_TYPE_RES = {
+        doc_type: [re.compile(pattern) for pattern in patterns]
+        for doc_type, patterns in DOC_TYPE_PATTERNS.items()
+    }
+
     # Folder name to document type mapping
     FOLDER_TYPE_MAP = {
         "clinical papers": DocumentType.CLINICAL_PAPER,
@@ -958,6 +1125,9 @@ class ChunkingStrategyFactory:
         "injection techniques": DocumentType.PROTOCOL,
     }
 
+    # Chunker instances built by get_chunker, keyed by document type
+    _chunkers: Dict[DocumentType, BaseChunker] = {}
+
     # Chunking configurations per document type
     CHUNK_CONFIGS = {
         DocumentType.CLINICAL_PAPER: {
@@ -1041,9 +1211,10 @@ class ChunkingStrategyFactory:
 
         # Try content patterns
         if text:
-            for doc_type, patterns in cls.DOC_TYPE_PATTERNS.items():
+            sample = text[:5000]  # Check first 5000 chars
+            for doc_type, patterns in cls._DOC_TYPE_RES.items():
                 for pattern in patterns:
-                    if re.search(pattern, text[:5000]):  # Check first 5000 chars
+                    if pattern.search(sample):
                         return doc_type
 
         return DocumentType.UNKNOWN
@@ -1052,12 +1223,19 @@ class ChunkingStrategyFactory:
     def get_chunker(cls, doc_type: DocumentType) -> BaseChunker:
         """
         Get appropriate chunker instance for document type
+
+        Chunkers only hold their configuration, so one instance per type is
+        built on first use and reused for every later document.
         """
-        config = cls.CHUNK_CONFIGS.get(doc_type, cls.CHUNK_CONFIGS[DocumentType.UNKNOWN])
-        chunker_class = config["chunker"]
-        params = config["params"]
+        chunker = cls._chunkers.get(doc_type)
+        if chunker is None:
+            config = cls.CHUNK_CONFIGS.get(doc_type, cls.CHUNK_CONFIGS[DocumentType.UNKNOWN])
+            chunker_class = config["chunker"]
+            params = config["params"]
+
+            chunker = cls._chunkers[doc_type] = chunker_class(**params)
 
-        return chunker_class(**params)
+        return chunker
 
     @classmethod
     def chunk_document(
@@ -1066,16 +1244,22 @@ class ChunkingStrategyFactory:
         doc_id: str,
         file_path: str = None,
         folder_name: str = None,
-        metadata: Dict[str, Any] = None
+        metadata: Dict[str, Any] = None,
+        doc_type: DocumentType = None
     ) -> Tuple[List[HierarchicalChunk], DocumentType]:
         """
         Chunk document using appropriate strategy
 
+        Args:
+            doc_type: Type already detected from the same text/path/folder
+                (skips detecting it again)
+
         Returns:
             Tuple of (chunks, detected_doc_type)
         """
         # Detect document type
-        doc_type = cls.detect_document_type(text, file_path, folder_name)
+        if doc_type is None:
+            doc_type = cls.detect_document_type(text, file_path, folder_name)
 
         # Get chunker
         chunker = cls.get_chunker(doc_type)
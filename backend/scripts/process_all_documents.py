@@ -9,6 +9,7 @@ Usage:
     python scripts/process_all_documents.py
     python scripts/process_all_documents.py --upload-to-pinecone
     python scripts/process_all_documents.py --dry-run
+    python scripts/process_all_documents.py --workers 4
 """
 
 import sys
@@ -40,13 +41,16 @@ class HierarchicalDocumentProcessor:
         self,
         upload_dir: str = "data/uploads",
         output_dir: str = "data/processed",
-        use_hierarchical: bool = True
+        use_hierarchical: bool = True,
+        workers: Optional[int] = None
     ):
         self.upload_dir = Path(upload_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
         self.processor = DocumentProcessor(use_hierarchical=use_hierarchical)
+        # Worker processes per folder (defaults to CPU count, 1 = sequential)
+        self.batch = DocumentBatch(self.processor, max_workers=workers)
         self.results = []
         self.stats = {
             "total_files": 0,
@@ -142,19 +146,27 @@ class HierarchicalDocumentProcessor:
         for folder_name, pdf_files in documents_by_folder.items():
             print(f"\n📁 Processing folder: {folder_name}")
 
+            pending = []
             for pdf_path in pdf_files:
-                processed_count += 1
-                progress = f"[{processed_count}/{total_files}]"
-
                 # Check if already processed
                 output_file = self.output_dir / f"{pdf_path.stem}_processed.json"
                 if output_file.exists() and not force_reprocess:
-                    print(f"  {progress} ⏭️  Skipping (already processed): {pdf_path.name}")
+                    processed_count += 1
+                    print(f"  [{processed_count}/{total_files}] ⏭️  Skipping (already processed): {pdf_path.name}")
                     self.stats["skipped"] += 1
                     continue
+                pending.append(pdf_path)
+
+            if not pending:
+                continue
+
+            # Process the folder's documents across worker processes
+            batch_results = self.batch.process_files(pending, folder_name=folder_name)
 
-                # Process the document
-                result = self._process_document(pdf_path, folder_name, progress)
+            for pdf_path, batch_result in zip(pending, batch_results):
+                processed_count += 1
+                progress = f"[{processed_count}/{total_files}]"
+                result = self._process_document(pdf_path, batch_result, progress)
                 self.results.append(result)
 
         # Calculate final statistics
@@ -168,29 +180,26 @@ class HierarchicalDocumentProcessor:
     def _process_document(
         self,
         pdf_path: Path,
-        folder_name: str,
+        batch_result: Dict[str, Any],
         progress: str
     ) -> Dict[str, Any]:
         """
-        Process a single document
+        Save and record a single processed document
 
         Args:
             pdf_path: Path to PDF file
-            folder_name: Name of containing folder
+            batch_result: DocumentBatch result for this file
             progress: Progress string for display
 
         Returns:
             Processing result dictionary
         """
         try:
-            print(f"  {progress} 📄 Processing: {pdf_path.name}")
+            print(f"  {progress} 📄 Processed: {pdf_path.name}")
 
-            # Process with hierarchical chunking
-            result = self.processor.process_pdf(
-                str(pdf_path),
-                doc_id=pdf_path.stem,
-                folder_name=folder_name
-            )
+            if not batch_result["success"]:
+                raise RuntimeError(batch_result["error"])
+            result = batch_result["result"]
 
             # Save processed document
             output_file = self.output_dir / f"{pdf_path.stem}_processed.json"
@@ -447,6 +456,12 @@ def main():
         default="default",
         help="Pinecone namespace for upload"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for PDF processing (default: CPU count, 1 = sequential)"
+    )
 
     args = parser.parse_args()
 
@@ -460,7 +475,8 @@ def main():
     processor = HierarchicalDocumentProcessor(
         upload_dir=args.upload_dir,
         output_dir=args.output_dir,
-        use_hierarchical=True
+        use_hierarchical=True,
+        workers=args.workers
     )
 
     # Process all documents
@@ -293,10 +293,11 @@ def cleanup_test_env():
         shutil.rmtree(test_upload_dir)
         print(f"✓ Removed {test_upload_dir}")
 
-    # Remove version database
-    if version_db_path.exists():
-        version_db_path.unlink()
-        print(f"✓ Removed {version_db_path}")
+    # Remove version database (snapshot and journal)
+    for db_file in (version_db_path, version_db_path.with_suffix(".jsonl")):
+        if db_file.exists():
+            db_file.unlink()
+            print(f"✓ Removed {db_file}")
 
 
 def main():
@@ -328,7 +328,7 @@ class TestSuite:
             "uvicorn",
             "pydantic",
             "structlog",
-            "PyPDF2",
+            "fitz",
             "pdfplumber"
         ]
         
@@ -4,10 +4,57 @@ Tests for Document Processing
 
 import pytest
 import os
+import time
 from pathlib import Path
 
-from app.utils.chunking import TextChunker, chunk_text_simple
-from app.utils.document_processor import DocumentProcessor
+from app.utils.chunking import TextChunker, TableChunker, chunk_text_simple
+from app.utils.document_processor import DocumentProcessor, DocumentBatch
+from app.utils.hierarchical_chunking import (
+    AdaptiveChunker, ChunkingStrategyFactory, DocumentType, HierarchicalChunker
+)
+
+
+def _write_table_pdf(pdf_path):
+    """Write a two-page PDF whose second page has a ruled dosing table"""
+    fitz = pytest.importorskip("fitz")
+
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Dosing overview for polynucleotide products.")
+    page = doc.new_page()
+    cells = [["Product", "Dose (ml)"], ["Plinest", "2"], ["Newest", "2"]]
+    x0, y0, width, height = 72, 100, 150, 30
+    for row_idx in range(len(cells) + 1):
+        page.draw_line((x0, y0 + row_idx * height), (x0 + 2 * width, y0 + row_idx * height))
+    for col_idx in range(3):
+        page.draw_line((x0 + col_idx * width, y0), (x0 + col_idx * width, y0 + len(cells) * height))
+    for row_idx, row in enumerate(cells):
+        for col_idx, text in enumerate(row):
+            page.insert_text((x0 + col_idx * width + 5, y0 + row_idx * height + 20), text)
+
+    doc.save(str(pdf_path))
+    doc.close()
+
+
+def _write_sample_pdf(pdf_path):
+    """Write a small two-page product PDF with PyMuPDF"""
+    fitz = pytest.importorskip("fitz")
+
+    doc = fitz.open()
+    doc.set_metadata({"title": "Plinest Factsheet", "author": "Mastelli"})
+    page_texts = [
+        "Product Name: Plinest\n"
+        "Composition: PN-HPT 40mg/2ml of purified polynucleotides.\n"
+        "Indications: Prevention of ageing and skin quality.",
+        "Protocol: Every 14-21 days for 3 to 4 sessions.\n"
+        "Technique: Microdroplet and retrograde linear injection.\n"
+        "Page 2",
+    ]
+    for text in page_texts:
+        page = doc.new_page()
+        page.insert_text((72, 72), text)
+
+    doc.save(str(pdf_path))
+    doc.close()
 
 
 class TestTextChunking:
@@ -49,7 +96,40 @@ class TestTextChunking:
                 for i in range(len(chunk_texts) - 1)
                 for word in chunk_texts[i].split()
             )
-    
+
+    def test_overlap_keeps_whole_sentences_and_offsets(self):
+        """Test that overlap carries whole sentences and offsets map to source text"""
+        text = "Alpha one two.  Beta three four.\nGamma five six. Delta seven eight."
+        chunker = TextChunker(chunk_size=35, chunk_overlap=17, min_chunk_size=1)
+        chunks = chunker.chunk_text(text)
+
+        assert [c.text for c in chunks] == [
+            "Alpha one two. Beta three four.",
+            "Beta three four. Gamma five six.",
+            "Gamma five six. Delta seven eight.",
+        ]
+        for chunk in chunks:
+            assert text[chunk.char_start:chunk.char_end].split() == chunk.text.split()
+
+    def test_unterminated_text_splits_in_linear_time(self):
+        """Test text without sentence punctuation (tables, OCR) splits quickly"""
+        text = "Plinest 2 ml 3 sessions " * 4000  # ~100 KB, no ". " boundary
+        chunker = TextChunker()
+
+        started = time.perf_counter()
+        spans = chunker._split_into_sentence_spans(text)
+        elapsed = time.perf_counter() - started
+
+        assert spans == [(text.strip(), 0, len(text.strip()))]
+        assert elapsed < 1.0
+
+    def test_table_type_priority(self):
+        """Test table type inference follows priority, not header order"""
+        assert TableChunker.infer_table_type(["Product", "Dose (ml)"]) == "dosing"
+        assert TableChunker.infer_table_type(["Outcome", "Treatment"]) == "protocol"
+        assert TableChunker.infer_table_type(["Contraindications"]) == "indication"
+        assert TableChunker.infer_table_type(["Name", None, "Notes"]) == "general"
+
     def test_metadata_preservation(self):
         """Test that metadata is preserved in chunks"""
         text = "Test document content."
@@ -61,15 +141,79 @@ class TestTextChunking:
         assert all(chunk["metadata"]["doc_id"] == "test_123" for chunk in chunks)
 
 
+class TestHierarchicalChunking:
+    """Test section-based hierarchical chunking"""
+
+    def test_section_offsets_point_into_source(self):
+        """Test parent chunk offsets locate their section, even when sections repeat"""
+        body = "Patients received 2 ml of Plinest every two weeks for three sessions. " * 3
+        text = f"ABSTRACT\n{body}\nRESULTS\n{body}\nDISCUSSION\n{body}"
+
+        chunks = HierarchicalChunker(min_chunk_size=50).chunk(text, "doc", "clinical_paper")
+        parents = [c for c in chunks if c.parent_id is None]
+
+        assert [c.section for c in parents] == ["Abstract", "Results", "Discussion"]
+        assert [text[c.char_start:c.char_end] for c in parents] == [body] * 3
+        assert parents[1].char_start == text.index("RESULTS\n") + len("RESULTS\n")
+
+    def test_child_overlap_keeps_whole_sentences(self):
+        """Test child chunks carry whole trailing sentences over, never fragments"""
+        sentences = [f"Patient {i} improved after treatment." for i in range(1, 13)]
+        text = "RESULTS\n" + " ".join(sentences)
+
+        chunker = HierarchicalChunker(child_chunk_size=100, child_overlap=50, min_chunk_size=20)
+        children = [c for c in chunker.chunk(text, "doc", "clinical_paper") if c.parent_id]
+
+        assert len(children) > 1
+        for previous, current in zip(children, children[1:]):
+            # Each chunk starts with the last sentence of the one before
+            last_sentence = previous.text.rsplit(". ", 1)[-1]
+            assert current.text.startswith(f"[Results] {last_sentence} ")
+
+    def test_child_offsets_point_into_source(self):
+        """Test child chunk offsets are document offsets, despite abbreviation masking"""
+        body = " ".join(
+            f"Patient {i} received 2. 5 ml,  i.e. approx. one vial of Plinest Hair. Hair density rose. " for i in range(1, 9)
+        )
+        text = f"ABSTRACT\nPolynucleotides for hair loss.\nRESULTS\n{body}"
+
+        chunker = HierarchicalChunker(child_chunk_size=150, child_overlap=0, min_chunk_size=20)
+        children = [c for c in chunker.chunk(text, "doc", "clinical_paper") if c.section == "Results" and c.parent_id]
+
+        assert len(children) > 1
+        for child in children:
+            source = text[child.char_start:child.char_end]
+            # Masking normalises whitespace ("2. 5" -> "2.5") and adds "®"
+            assert source.replace(" ", "") == child.text[len("[Results] "):].replace(" ", "").replace("®", "")
+        assert children[0].char_start == text.index("Patient 1")
+        assert children[-1].char_end == len(text.rstrip())
+
+    @pytest.mark.parametrize("overlap", [0, 30])
+    def test_adaptive_offsets_point_into_source(self, overlap):
+        """Test adaptive chunk offsets cover their text in the source, overlap included"""
+        # Paragraph gaps other than "\n\n", and an overlap that carries into the next overlap
+        text = (
+            "The patient presented with fine lines and dull skin on cheeks.\n\n\n"
+            "No redness\n \nSwelling is low\n\nSkin was firmer and brighter at review\n\n"
+        )
+
+        chunker = AdaptiveChunker(chunk_size=80, min_chunk_size=10, overlap=overlap, use_semantic_similarity=False)
+        chunks = chunker.chunk(text, "doc", "case_study")
+
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert text[chunk.char_start:chunk.char_end].split() == chunk.text.split()
+
+
 class TestDocumentProcessor:
     """Test document processing functionality"""
     
     @pytest.fixture
     def sample_pdf_path(self, tmp_path):
         """Create a sample PDF for testing"""
-        # Note: In real tests, you'd create or use actual PDFs
-        # For now, we'll skip PDF tests if file doesn't exist
-        return None
+        pdf_path = tmp_path / "plinest_factsheet.pdf"
+        _write_sample_pdf(pdf_path)
+        return str(pdf_path)
     
     def test_processor_initialization(self):
         """Test that processor initializes correctly"""
@@ -90,20 +234,306 @@ class TestDocumentProcessor:
         dirty_text = "Text\x00with\x00nulls"
         clean = processor._clean_text(dirty_text)
         assert "\x00" not in clean
-    
-    @pytest.mark.skip(reason="Requires actual PDF file")
+
+    def test_text_cleaning_page_labels(self):
+        """Test page-number lines are dropped while line structure is kept"""
+        processor = DocumentProcessor()
+
+        dirty_text = "ABSTRACT\r\n  Body\t\ttext \n\n\n\nPage 3\n2/10\nConclusion"
+        clean = processor._clean_text(dirty_text)
+
+        assert clean == "ABSTRACT\nBody text\n\nConclusion"
+
+        # Whitespace-only pages clean to an empty string
+        assert processor._clean_text(" \n\t\r\n ") == ""
+
+    def test_extract_product_info(self):
+        """Test product fields are found across chunks, labelled name first"""
+        processor = DocumentProcessor()
+        chunks = [
+            {"text": "Newest® overview. Composition: PN-HPT 40mg, Dose: 2ml."},
+            {"text": "Product Name: Plinest. Protocol: every 14 days."},
+        ]
+
+        info = processor.extract_product_info(chunks)
+
+        assert info["name"] == "Plinest"
+        assert info["composition"] == "PN-HPT 40mg, Dose: 2ml"
+        assert info["dosing"] == "2ml"
+
+    def test_extract_product_info_stops_early(self):
+        """Test the scan stops once every field is found in the leading chunk"""
+        class Unread(dict):
+            def __getitem__(self, key):
+                raise AssertionError("chunk should not be scanned")
+
+        processor = DocumentProcessor()
+        chunks = [
+            {"text": "Product Name: Plinest. Composition: PN-HPT. Dose: 2ml."},
+            Unread(),
+        ]
+
+        info = processor.extract_product_info(chunks)
+
+        assert (info["name"], info["composition"], info["dosing"]) == ("Plinest", "PN-HPT", "2ml")
+
     def test_pdf_processing(self, sample_pdf_path):
         """Test full PDF processing pipeline"""
         if not sample_pdf_path or not os.path.exists(sample_pdf_path):
             pytest.skip("No sample PDF available")
         
         processor = DocumentProcessor()
-        result = processor.process_pdf(sample_pdf_path)
+        result = processor.process_pdf(sample_pdf_path, doc_type="factsheet")
         
         assert "doc_id" in result
         assert "chunks" in result
         assert "stats" in result
         assert len(result["chunks"]) > 0
+        assert result["metadata"]["title"] == "Plinest Factsheet"
+        assert result["metadata"]["num_pages"] == 2
+        assert [p["page_number"] for p in result["pages"]] == [1, 2]
+        assert "Page 2" not in result["pages"][1]["text"]
+        assert result["full_text"].startswith("Product Name: Plinest")
+        assert set(result["pages"][0]) == {"page_number", "text"}
+
+    def test_pdf_processing_page_details(self, sample_pdf_path):
+        """Test per-page char_count/is_header_page are added only on request"""
+        processor = DocumentProcessor(include_page_details=True)
+        result = processor.process_pdf(sample_pdf_path, doc_type="factsheet")
+
+        first_page = result["pages"][0]
+        assert first_page["char_count"] == len(first_page["text"])
+        assert first_page["is_header_page"] is True
+
+    def test_pdfium_fallback_extraction(self, sample_pdf_path):
+        """Test the pypdfium2 fallback returns the same metadata and page shape"""
+        processor = DocumentProcessor()
+        metadata, pages = processor._extract_with_pdfium(sample_pdf_path)
+
+        assert metadata["title"] == "Plinest Factsheet"
+        assert metadata["num_pages"] == 2
+        assert [p["page_number"] for p in pages] == [1, 2]
+        assert pages[0]["text"].startswith("Product Name: Plinest\nComposition:")
+        assert "Page 2" not in pages[1]["text"]
+
+    def test_pdf_processing_missing_file(self, tmp_path):
+        """Test a missing file is reported before any extraction runs"""
+        with pytest.raises(FileNotFoundError):
+            DocumentProcessor().process_pdf(str(tmp_path / "missing.pdf"))
+
+    def test_pdf_processing_without_full_text(self, sample_pdf_path):
+        """Test full_text can be dropped from the result"""
+        processor = DocumentProcessor()
+        result = processor.process_pdf(sample_pdf_path, include_full_text=False)
+
+        assert result["full_text"] is None
+        assert result["stats"]["total_chars"] > 0
+        assert len(result["chunks"]) > 0
+
+    @pytest.mark.parametrize("table_backend", ["auto", "pdfplumber"])
+    def test_table_extraction_only_on_ruled_pages(self, tmp_path, table_backend):
+        """Test the table finder only searches pages that have drawn lines"""
+        pdf_path = tmp_path / "dosing_table.pdf"
+        _write_table_pdf(pdf_path)
+        processor = DocumentProcessor(table_backend=table_backend)
+
+        result = processor.process_pdf(str(pdf_path))
+
+        assert [(t["page_number"], t["headers"]) for t in result["tables"]] == [
+            (2, ["Product", "Dose (ml)"])
+        ]
+        assert result["stats"]["num_table_chunks"] == 1
+
+    def test_unknown_table_backend(self):
+        """Test an unsupported table backend is rejected up front"""
+        with pytest.raises(ValueError):
+            DocumentProcessor(table_backend="camelot")
+
+    def test_pymupdf_table_backend_needs_table_finder(self, monkeypatch):
+        """Test "pymupdf" is rejected, not silently replaced, without Page.find_tables"""
+        fitz = pytest.importorskip("fitz")
+        monkeypatch.delattr(fitz.Page, "find_tables", raising=False)
+
+        with pytest.raises(ValueError, match="pymupdf"):
+            DocumentProcessor(table_backend="pymupdf")
+        assert DocumentProcessor(table_backend="auto").table_backend == "auto"
+
+    def test_pdf_processing_without_tables(self, sample_pdf_path, monkeypatch):
+        """Test table extraction is skipped entirely when not requested"""
+        processor = DocumentProcessor()
+
+        def fail(*args, **kwargs):
+            raise AssertionError("tables should not be extracted")
+
+        monkeypatch.setattr(processor, "_extract_tables", fail)
+        result = processor.process_pdf(sample_pdf_path, extract_tables=False)
+
+        assert result["tables"] == []
+        assert len(result["chunks"]) > 0
+
+    def test_parallel_page_extraction_matches_sequential(self, tmp_path):
+        """Test page text read across worker processes keeps page order"""
+        fitz = pytest.importorskip("fitz")
+
+        doc = fitz.open()
+        for page_num in range(10):
+            doc.new_page().insert_text((72, 72), f"Section {page_num + 1}: injection technique notes.")
+        pdf_bytes = doc.tobytes()
+        doc.close()
+
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        try:
+            sequential = DocumentProcessor()._extract_text_by_page(doc, pdf_bytes)
+            parallel = DocumentProcessor(page_workers=3)._extract_text_by_page(doc, pdf_bytes)
+        finally:
+            doc.close()
+
+        assert parallel == sequential
+        assert [p["text"] for p in parallel][:2] == [
+            "Section 1: injection technique notes.",
+            "Section 2: injection technique notes.",
+        ]
+
+    def test_small_images_skipped_before_extraction(self, monkeypatch):
+        """Test icon-sized images are filtered out without being extracted"""
+        fitz = pytest.importorskip("fitz")
+
+        doc = fitz.open()
+        page = doc.new_page()
+        for size, y in ((40, 72), (160, 200)):
+            pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, size, size), False)
+            pixmap.clear_with(200)
+            page.insert_image(fitz.Rect(72, y, 72 + size, y + size), pixmap=pixmap)
+        pdf_bytes = doc.tobytes()
+        doc.close()
+
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        extracted = []
+        original_extract_image = doc.extract_image
+
+        def spy_extract_image(xref):
+            extracted.append(xref)
+            return original_extract_image(xref)
+
+        monkeypatch.setattr(doc, "extract_image", spy_extract_image)
+        try:
+            images = DocumentProcessor(retain_image_bytes=True)._extract_images(doc)
+            metadata_only = DocumentProcessor()._extract_images(doc)
+        finally:
+            doc.close()
+
+        assert [(image["width"], image["height"]) for image in images] == [(160, 160)]
+        assert extracted == [images[0]["xref"]]
+        assert images[0]["image_bytes"]
+
+        # Without image analysis the stream is never read
+        assert [(image["width"], image["height"]) for image in metadata_only] == [(160, 160)]
+        assert metadata_only[0]["image_bytes"] is None
+        assert metadata_only[0]["size_bytes"] == 160 * 160 * 3
+
+    def test_image_chunks_keep_image_order(self, monkeypatch):
+        """Test concurrent Vision requests still yield chunks in image order"""
+        import app.services.vision_service as vision_module
+
+        class FakeVisionService:
+            def describe_image(self, image_bytes, image_type="png", context="", max_tokens=500):
+                return {"description": f"{image_bytes.decode()} | {context}", "model": "fake"}
+
+        monkeypatch.setattr(vision_module, "get_vision_service", lambda: FakeVisionService())
+
+        processor = DocumentProcessor(enable_image_analysis=True, vision_concurrency=3)
+        images = [
+            {"page_number": page_number, "image_index": 0, "image_bytes": f"img{page_number}".encode()}
+            for page_number in (1, 2, 3, 4)
+        ]
+        pages = [{"page_number": n, "text": f"Page text {n}"} for n in (1, 2, 3, 4, 5)]
+
+        chunks = processor._create_image_chunks(images, {"doc_id": "doc"}, pages)
+
+        assert [chunk["chunk_id"] for chunk in chunks] == [
+            "doc_image_p1_i0", "doc_image_p2_i0", "doc_image_p3_i0", "doc_image_p4_i0"
+        ]
+        assert chunks[1]["text"].endswith("img2 | Page text 2")
+
+    def test_repeated_images_described_once(self, monkeypatch):
+        """Test identical images on several pages share one Vision request"""
+        import app.services.vision_service as vision_module
+
+        calls = []
+
+        class FakeVisionService:
+            def describe_image(self, image_bytes, image_type="png", context="", max_tokens=500):
+                calls.append(image_bytes)
+                return {"description": "Company logo", "model": "fake"}
+
+        monkeypatch.setattr(vision_module, "get_vision_service", lambda: FakeVisionService())
+
+        processor = DocumentProcessor(enable_image_analysis=True)
+        images = [
+            {"page_number": page_number, "image_index": 0, "image_bytes": b"logo"}
+            for page_number in (1, 2, 3)
+        ]
+
+        chunks = processor._create_image_chunks(images, {"doc_id": "doc"})
+
+        assert calls == [b"logo"]
+        assert [chunk["metadata"]["page_number"] for chunk in chunks] == [1, 2, 3]
+
+    def test_chunker_reused_per_document_type(self, sample_pdf_path):
+        """Test chunkers are built once per type and reported by strategy name"""
+        chunker = ChunkingStrategyFactory.get_chunker(DocumentType.FACTSHEET)
+        assert ChunkingStrategyFactory.get_chunker(DocumentType.FACTSHEET) is chunker
+
+        result = DocumentProcessor().process_pdf(sample_pdf_path)
+        assert result["detected_type"] == "factsheet"
+        assert result["chunking_strategy"] == type(chunker).__name__
+
+    def test_legacy_pdf_processing(self, sample_pdf_path):
+        """Test PDF processing with the legacy TextChunker path"""
+        processor = DocumentProcessor(use_hierarchical=False)
+        result = processor.process_pdf(sample_pdf_path)
+
+        assert result["chunking_strategy"] == "TextChunker (legacy)"
+        assert result["stats"]["num_pages"] == 2
+        # Short pages are chunked together rather than one chunk per page
+        assert len(result["chunks"]) == 1
+        assert result["chunks"][0]["metadata"]["page_number"] == 1
+
+    def test_legacy_chunks_map_to_pages(self, sample_pdf_path):
+        """Test legacy chunks of the concatenated text keep their page numbers"""
+        processor = DocumentProcessor(chunk_size=80, chunk_overlap=0, use_hierarchical=False)
+        result = processor.process_pdf(sample_pdf_path)
+
+        assert [c["metadata"]["page_number"] for c in result["chunks"]] == [1, 1, 2]
+        assert result["chunks"][2]["text"].startswith("Protocol:")
+
+
+class TestDocumentBatch:
+    """Test batch processing of a directory"""
+
+    def test_parallel_matches_sequential(self, tmp_path):
+        """Test that the process pool returns the same results, in file order"""
+        folder = tmp_path / "Fact Sheets"
+        folder.mkdir()
+        for name in ("plinest", "newest", "purasomes"):
+            _write_sample_pdf(folder / f"{name}.pdf")
+
+        sequential = DocumentBatch(max_workers=1).process_directory(str(folder))
+        batch = DocumentBatch(max_workers=2)
+        parallel = batch.process_directory(str(folder))
+
+        assert [r["file"] for r in parallel] == [r["file"] for r in sequential]
+        assert all(r["success"] for r in parallel)
+        assert [r["detected_type"] for r in parallel] == ["factsheet"] * 3
+        assert [r["result"]["stats"]["num_chunks"] for r in parallel] == \
+            [r["result"]["stats"]["num_chunks"] for r in sequential]
+        summary = batch.get_summary()
+        assert summary["successful"] == 3
+        assert summary["failed"] == 0
+        assert summary["document_types"] == {"factsheet": 3}
+        assert summary["total_chunks"] == sum(
+            r["result"]["stats"]["num_chunks"] for r in parallel
+        )
 
 
 class TestIntegration:
@@ -0,0 +1,308 @@
+"""
+Tests for Document Versioning
+"""
+
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+import app.utils.document_versioning as document_versioning
+from app.utils.document_versioning import DocumentVersionManager
+
+
+@pytest.fixture
+def version_manager(tmp_path):
+    """Version manager backed by a temporary database"""
+    return DocumentVersionManager(version_db_path=tmp_path / "versions" / "versions.json")
+
+
+@pytest.fixture
+def upload_dir(tmp_path):
+    """Upload directory with a few PDFs, one in a subfolder"""
+    upload_dir = tmp_path / "uploads"
+    (upload_dir / "Factsheet").mkdir(parents=True)
+    for name in ("Plinest.pdf", "Newest.pdf", "Factsheet/Purasomes.pdf", "Factsheet/NewGyn.pdf"):
+        (upload_dir / name).write_bytes(f"%PDF-1.4 {name}".encode())
+    return upload_dir
+
+
+class TestFileHashing:
+    """Test file hash computation"""
+
+    @pytest.mark.parametrize("use_file_digest", [True, False])
+    def test_compute_file_hash(self, tmp_path, monkeypatch, use_file_digest):
+        """Test the hash matches hashlib's SHA256 of the file, with or without hashlib.file_digest"""
+        if use_file_digest:
+            if not hasattr(hashlib, "file_digest"):
+                pytest.skip("hashlib.file_digest needs Python 3.11")
+        else:
+            monkeypatch.delattr(hashlib, "file_digest", raising=False)
+
+        # Larger than one read block
+        file_path = tmp_path / "doc.pdf"
+        file_path.write_bytes(b"%PDF-1.4 content" * 100000)
+
+        expected = hashlib.sha256(file_path.read_bytes())
+        assert DocumentVersionManager.compute_file_hash(file_path) == expected.hexdigest()
+        assert DocumentVersionManager.compute_file_digest(file_path) == expected.digest()
+
+    def test_compute_file_hash_empty_file(self, tmp_path):
+        """Test an empty file hashes to the SHA256 of no data"""
+        file_path = tmp_path / "empty.pdf"
+        file_path.write_bytes(b"")
+
+        assert DocumentVersionManager.compute_file_hash(file_path) == hashlib.sha256().hexdigest()
+
+    def test_compute_file_hashes_keeps_order(self, version_manager, upload_dir):
+        """Test parallel hashing returns hashes in input order"""
+        paths = sorted(upload_dir.rglob("*.pdf"))
+
+        assert version_manager.compute_file_hashes(paths) == [
+            DocumentVersionManager.compute_file_hash(path) for path in paths
+        ]
+
+
+class TestVersionStorage:
+    """Test the versions.json database"""
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_versions_round_trip(self, tmp_path, upload_dir, monkeypatch, use_orjson):
+        """Test saved versions reload identically, with or without orjson"""
+        if use_orjson:
+            pytest.importorskip("orjson")
+        else:
+            monkeypatch.setattr(document_versioning, "orjson", None)
+
+        db_path = tmp_path / "versions.json"
+        manager = DocumentVersionManager(version_db_path=db_path)
+        manager.register_version("Plinest", upload_dir / "Plinest.pdf", metadata={"product": "Plinest®"})
+        manager.register_version("Plinest", upload_dir / "Plinest.pdf")
+
+        history = [v.to_dict() for v in manager.get_version_history("Plinest")]
+
+        # Registrations are journaled, then folded into versions.json
+        assert not db_path.exists()
+        reloaded = DocumentVersionManager(version_db_path=db_path)
+        assert [v.to_dict() for v in reloaded.get_version_history("Plinest")] == history
+
+        manager.compact()
+        assert not manager.journal_path.exists()
+        assert json.loads(db_path.read_text(encoding="utf-8"))["Plinest"][1]["supersedes"] == "v1.0"
+        reloaded = DocumentVersionManager(version_db_path=db_path)
+        assert [v.to_dict() for v in reloaded.get_version_history("Plinest")] == history
+
+    def test_invalid_hash_does_not_drop_versions(self, tmp_path, upload_dir):
+        """Test a record with a non-hex hash loads, round-trips and counts as changed"""
+        pdf_path = upload_dir / "Plinest.pdf"
+        db_path = tmp_path / "versions.json"
+        manager = DocumentVersionManager(version_db_path=db_path)
+        manager.register_version("Plinest", pdf_path)
+        manager.register_version("Newest", upload_dir / "Newest.pdf")
+        manager.compact()
+
+        data = json.loads(db_path.read_text(encoding="utf-8"))
+        data["Plinest"][0]["file_hash"] = "not-a-hash"
+        db_path.write_text(json.dumps(data), encoding="utf-8")
+
+        reloaded = DocumentVersionManager(version_db_path=db_path)
+        assert sorted(reloaded.versions) == ["Newest", "Plinest"]
+        assert reloaded.get_current_version("Plinest").file_hash == "not-a-hash"
+        assert reloaded.has_changed("Plinest", pdf_path)
+
+        reloaded.compact()
+        assert json.loads(db_path.read_text(encoding="utf-8")) == data
+
+    def test_journal_replay_after_interrupted_compaction(self, tmp_path, upload_dir):
+        """Test journal entries already in versions.json are not applied twice"""
+        db_path = tmp_path / "versions.json"
+        manager = DocumentVersionManager(version_db_path=db_path)
+        manager.register_version("Plinest", upload_dir / "Plinest.pdf")
+        manager.register_version("Plinest", upload_dir / "Plinest.pdf")
+        journal = manager.journal_path.read_bytes()
+
+        # Snapshot written, but the journal was not cleared
+        manager.compact()
+        manager.journal_path.write_bytes(journal + b'{"doc_id": "Plin')
+
+        reloaded = DocumentVersionManager(version_db_path=db_path)
+        assert [v.version for v in reloaded.get_version_history("Plinest")] == ["v1.0", "v1.1"]
+
+    def test_compacts_after_many_registrations(self, tmp_path, upload_dir, monkeypatch):
+        """Test the journal is folded into versions.json periodically"""
+        monkeypatch.setattr(document_versioning, "_COMPACT_EVERY", 3)
+        manager = DocumentVersionManager(version_db_path=tmp_path / "versions.json")
+
+        for _ in range(4):
+            manager.register_version("Plinest", upload_dir / "Plinest.pdf")
+
+        saved = json.loads((tmp_path / "versions.json").read_text(encoding="utf-8"))
+        assert len(saved["Plinest"]) == 3
+        assert len(manager.journal_path.read_text(encoding="utf-8").splitlines()) == 1
+
+    def test_concurrent_registrations(self, tmp_path, upload_dir, monkeypatch):
+        """Test registrations from several threads are all kept, in sequence"""
+        monkeypatch.setattr(document_versioning, "_COMPACT_EVERY", 5)
+        db_path = tmp_path / "versions.json"
+        manager = DocumentVersionManager(version_db_path=db_path)
+        pdf_path = upload_dir / "Plinest.pdf"
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: manager.register_version("Plinest", pdf_path), range(12)))
+
+        history = manager.get_version_history("Plinest")
+        assert [v.version for v in history] == [f"v1.{i}" for i in range(12)]
+        assert not db_path.with_suffix(".json.tmp").exists()
+
+        reloaded = DocumentVersionManager(version_db_path=db_path)
+        assert [v.version for v in reloaded.get_version_history("Plinest")] == [v.version for v in history]
+
+
+class TestVersionRegistration:
+    """Test version numbering"""
+
+    @pytest.mark.parametrize("current, expected", [
+        ("v1.0", "v1.1"),
+        ("v2.9", "v2.10"),
+        ("v3", "v3.1"),
+        ("v2.1.4", "v2.2"),
+    ])
+    def test_auto_version_increments_minor(self, version_manager, upload_dir, current, expected):
+        """Test the next version bumps the minor number of the current one"""
+        pdf_path = upload_dir / "Plinest.pdf"
+        version_manager.register_version("Plinest", pdf_path, version=current)
+
+        assert version_manager.register_version("Plinest", pdf_path).version == expected
+
+    def test_register_with_known_hash_skips_hashing(self, version_manager, upload_dir, monkeypatch):
+        """Test a hash from detect_updates is reused instead of recomputed"""
+        changes = version_manager.detect_updates(upload_dir)
+        details = changes["details"]["Plinest"]
+
+        def fail(file_path):
+            raise AssertionError("file should not be hashed again")
+
+        monkeypatch.setattr(version_manager, "compute_file_digest_and_stat", fail)
+        monkeypatch.setattr(version_manager, "compute_file_digest", fail)
+        doc_version = version_manager.register_version(
+            "Plinest", details["file_path"], file_hash=details["new_hash"]
+        )
+
+        assert doc_version.file_hash == details["new_hash"]
+        assert not version_manager.has_changed("Plinest", details["file_path"], file_hash=details["new_hash"])
+        # The file may have changed since it was hashed, so no stat is trusted
+        assert doc_version.file_size is None
+
+    def test_register_with_known_hash_keeps_prehash_stat(self, version_manager, upload_dir, monkeypatch):
+        """Test the stat detect_updates took before hashing is saved with its hash"""
+        details = version_manager.detect_updates(upload_dir)["details"]["Plinest"]
+        doc_version = version_manager.register_version(
+            "Plinest", details["file_path"], file_hash=details["new_hash"],
+            file_size=details["file_size"], file_mtime_ns=details["file_mtime_ns"]
+        )
+        assert doc_version.file_size == details["file_size"]
+
+        hashed = []
+        original_digest = DocumentVersionManager.compute_file_digest
+
+        def spy_digest(file_path):
+            hashed.append(file_path.name)
+            return original_digest(file_path)
+
+        monkeypatch.setattr(version_manager, "compute_file_digest", spy_digest)
+        assert version_manager.detect_updates(upload_dir)["details"]["Plinest"]["status"] == "unchanged"
+        assert "Plinest.pdf" not in hashed
+
+    def test_has_changed_size_mismatch_skips_hashing(self, version_manager, upload_dir, monkeypatch):
+        """Test a file whose size changed is reported changed without hashing"""
+        pdf_path = upload_dir / "Plinest.pdf"
+        assert version_manager.has_size_changed("Plinest", pdf_path)
+        version_manager.register_version("Plinest", pdf_path)
+        assert not version_manager.has_changed("Plinest", pdf_path)
+        assert not version_manager.has_size_changed("Plinest", pdf_path)
+
+        def fail(file_path):
+            raise AssertionError("file should not be hashed")
+
+        monkeypatch.setattr(version_manager, "compute_file_digest", fail)
+        pdf_path.write_bytes(b"%PDF-1.4 Plinest, longer v2")
+
+        assert version_manager.has_size_changed("Plinest", pdf_path)
+        assert version_manager.has_changed("Plinest", pdf_path)
+
+    def test_auto_version_falls_back_to_timestamp(self, version_manager, upload_dir):
+        """Test unparseable versions are followed by a timestamp version"""
+        pdf_path = upload_dir / "Plinest.pdf"
+        version_manager.register_version("Plinest", pdf_path, version="draft")
+
+        assert version_manager.register_version("Plinest", pdf_path).version.startswith("v_")
+
+
+class TestUpdateDetection:
+    """Test scanning an upload directory for changes"""
+
+    def test_detect_updates(self, version_manager, upload_dir):
+        """Test new, updated and unchanged documents are classified"""
+        changes = version_manager.detect_updates(upload_dir)
+        assert sorted(changes["new"]) == [
+            "Factsheet_NewGyn", "Factsheet_Purasomes", "Newest", "Plinest"
+        ]
+
+        for doc_id in changes["new"]:
+            version_manager.register_version(doc_id, changes["details"][doc_id]["file_path"])
+        (upload_dir / "Plinest.pdf").write_bytes(b"%PDF-1.4 Plinest v2")
+
+        changes = version_manager.detect_updates(upload_dir)
+        assert changes["new"] == []
+        assert changes["updated"] == ["Plinest"]
+        assert sorted(changes["unchanged"]) == ["Factsheet_NewGyn", "Factsheet_Purasomes", "Newest"]
+        assert changes["details"]["Plinest"]["old_version"] == "v1.0"
+
+    def test_detect_updates_missing_dir(self, version_manager, tmp_path):
+        """Test a missing upload directory is reported empty, not an error"""
+        changes = version_manager.detect_updates(tmp_path / "missing")
+
+        assert changes == {"new": [], "updated": [], "unchanged": [], "details": {}}
+
+    def test_detect_updates_relative_root(self, version_manager, upload_dir, monkeypatch):
+        """Test doc_ids are relative paths when the upload directory is "." """
+        monkeypatch.chdir(upload_dir)
+        changes = version_manager.detect_updates(Path("."))
+
+        assert sorted(changes["new"]) == [
+            "Factsheet_NewGyn", "Factsheet_Purasomes", "Newest", "Plinest"
+        ]
+        assert changes["details"]["Plinest"]["file_path"] == "Plinest.pdf"
+
+    def test_unchanged_stat_skips_hashing(self, version_manager, upload_dir, monkeypatch):
+        """Test files with the registered size/mtime are not hashed again"""
+        for pdf_path in upload_dir.rglob("*.pdf"):
+            doc_id = str(pdf_path.relative_to(upload_dir).with_suffix("")).replace("/", "_")
+            version_manager.register_version(doc_id, pdf_path)
+
+        hashed = []
+        original_digest = DocumentVersionManager.compute_file_digest
+
+        def spy_digest(file_path):
+            hashed.append(file_path.name)
+            return original_digest(file_path)
+
+        monkeypatch.setattr(version_manager, "compute_file_digest", spy_digest)
+
+        changes = version_manager.detect_updates(upload_dir)
+        assert len(changes["unchanged"]) == 4
+        assert hashed == []
+
+        changes = version_manager.detect_updates(upload_dir, force_rehash=True)
+        assert len(changes["unchanged"]) == 4
+        assert len(hashed) == 4
+
+    def test_versions_without_stat_are_hashed(self, version_manager, upload_dir):
+        """Test versions saved before stats were recorded still compare by hash"""
+        pdf_path = upload_dir / "Plinest.pdf"
+        version = version_manager.register_version("Plinest", pdf_path)
+        version.file_size = version.file_mtime_ns = None
+
+        assert version_manager.detect_updates(upload_dir)["details"]["Plinest"]["status"] == "unchanged"